@@ -1,10 +1,14 @@
 import ast
-import os
 from collections import defaultdict
-import networkx as nx
-import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 import subprocess
+from compact_graph import CompactGraph
+from graph_filter import filter_graph
+from renderer import compute_layout, render_all
+from discovery import discover, read_source, read_sources
+
+# Per-edge labels dominate PNG render time on large graphs
+EDGE_LABEL_LIMIT = 200
 
 
 class ClassUsageExtractor(ast.NodeVisitor):
@@ -53,54 +57,60 @@ class ClassUsageExtractor(ast.NodeVisitor):
 
 def extract_relations_from_folder(folder):
     extractor = ClassUsageExtractor()
-    for root, _, files in os.walk(folder):
-        for file in files:
-            if file.endswith(".py"):
-                path = os.path.join(root, file)
-                try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        tree = ast.parse(f.read(), filename=path)
-                        extractor.visit(tree)
-                except Exception as e:
-                    print(f"[!] Skipped {path}: {e}")
+    for entry, source in read_sources(discover(folder)):
+        try:
+            tree = ast.parse(source, filename=entry.full_path)
+            extractor.visit(tree)
+        except Exception as e:
+            print(f"[!] Skipped {entry.full_path}: {e}")
     return extractor.inheritance, extractor.usage
 
 
 def get_class_locs(folder_path):
     class_locs = {}
 
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py"):
-                full_path = os.path.join(root, file)
-                module_path = os.path.relpath(full_path, folder_path).replace(
-                    "/", ".").replace("\\", ".").replace(".py", "")
-                try:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        source = f.read()
-                        tree = ast.parse(source)
-                        lines = source.splitlines()
-
-                        for node in ast.walk(tree):
-                            if isinstance(node, ast.ClassDef):
-                                class_name = f"{module_path}.{node.name}"
-                                start_line = node.lineno - 1
-                                end_line = max([child.lineno for child in ast.walk(
-                                    node) if hasattr(child, 'lineno')], default=start_line)
-
-                                loc = 0
-                                for i in range(start_line, end_line):
-                                    line = lines[i].strip()
-                                    if line and not line.startswith("#"):
-                                        loc += 1
-                                class_locs[class_name] = loc
-
-                except Exception as e:
-                    print(f"Error parsing {full_path}: {e}")
+    for entry in discover(folder_path):
+        module_path = entry.rel_path.replace("/", ".").replace(".py", "")
+        try:
+            source = read_source(entry)
+            tree = ast.parse(source)
+            lines = source.splitlines()
+
+            for node in ast.walk(tree):
+                if isinstance(node, ast.ClassDef):
+                    class_name = f"{module_path}.{node.name}"
+                    start_line = node.lineno - 1
+                    end_line = max([child.lineno for child in ast.walk(
+                        node) if hasattr(child, 'lineno')], default=start_line)
+
+                    loc = 0
+                    for i in range(start_line, end_line):
+                        line = lines[i].strip()
+                        if line and not line.startswith(b"#"):
+                            loc += 1
+                    class_locs[class_name] = loc
+
+        except Exception as e:
+            print(f"Error parsing {entry.full_path}: {e}")
 
     return class_locs
 
 
+def short_name_locs(locs):
+    # Refine mapping using short names (only if unique)
+    short_name_index = defaultdict(list)
+    for full_name, loc in locs.items():
+        short_name = full_name.split(".")[-1]
+        short_name_index[short_name].append(loc)
+
+    # Only keep names that map unambiguously to one class
+    return {
+        name: locs[0]
+        for name, locs in short_name_index.items()
+        if len(locs) == 1
+    }
+
+
 def get_churn_by_file(repo_path):
     churn = {}
     result = subprocess.run(
@@ -121,41 +131,24 @@ def get_churn_by_file(repo_path):
 def map_churn_to_classes(folder_path, churn_by_file):
     class_churn = {}
 
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py"):
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(
-                    full_path, folder_path).replace("\\", "/")
-                churn_value = churn_by_file.get(rel_path, 0)
-
-                try:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        tree = ast.parse(f.read())
-                        for node in ast.walk(tree):
-                            if isinstance(node, ast.ClassDef):
-                                class_name = node.name
-                                class_churn[class_name] = churn_value
-                except Exception as e:
-                    print(f"Error processing churn for {rel_path}: {e}")
-
-    return class_churn
+    for entry in discover(folder_path):
+        churn_value = churn_by_file.get(entry.rel_path, 0)
 
+        try:
+            tree = ast.parse(read_source(entry))
+            for node in ast.walk(tree):
+                if isinstance(node, ast.ClassDef):
+                    class_name = node.name
+                    class_churn[class_name] = churn_value
+        except Exception as e:
+            print(f"Error processing churn for {entry.rel_path}: {e}")
 
-def save_plotly_graph(inheritance, usage, output_file="zeeguu_class_relations.html", class_locs=None, class_churns=None):
-    G = nx.DiGraph()
+    return class_churn
 
-    # Add edges and build full node list
-    nodes = set()
-    for child, parent in inheritance:
-        G.add_edge(child, parent, relation="inherits")
-        nodes.update([child, parent])
-    for user_class, used_classes in usage.items():
-        for used_class in used_classes:
-            G.add_edge(user_class, used_class, relation="uses")
-            nodes.update([user_class, used_class])
 
-    pos = nx.spring_layout(G, seed=42)
+def build_class_figure(G, class_locs=None, class_churns=None, pos=None):
+    if pos is None:
+        pos = compute_layout(G)
 
     edge_x = []
     edge_y = []
@@ -213,51 +206,36 @@ def save_plotly_graph(inheritance, usage, output_file="zeeguu_class_relations.ht
                         xaxis=dict(showgrid=False, zeroline=False),
                         yaxis=dict(showgrid=False, zeroline=False))
                     )
-    fig.write_html(output_file)
-    print(f"Saved interactive graph to {output_file}")
-
-
-inheritance, usage = extract_relations_from_folder("api")
-locs = get_class_locs("api")
+    return fig
 
-# Step 2: Refine mapping using short names (only if unique)
-short_name_index = defaultdict(list)
-for full_name, loc in locs.items():
-    short_name = full_name.split(".")[-1]
-    short_name_index[short_name].append(loc)
 
-# Only keep names that map unambiguously to one class
-short_class_locs = {
-    name: locs[0]
-    for name, locs in short_name_index.items()
-    if len(locs) == 1
-}
+def save_plotly_graph(inheritance, usage, output_file="zeeguu_class_relations.html", class_locs=None, class_churns=None, view=None):
+    G = CompactGraph.from_class_relations(inheritance, usage).to_networkx()
 
-churn_by_file = get_churn_by_file("api")
-class_churn = map_churn_to_classes("api", churn_by_file)
+    # Narrow the graph before layout, e.g. view=dict(focus="User", radius=2)
+    if view:
+        G = filter_graph(G, metrics={"loc": class_locs or {},
+                                     "churn": class_churns or {}}, **view)
 
-save_plotly_graph(inheritance, usage,
-                  "zeeguu_class_relations.html", class_locs=short_class_locs, class_churns=class_churn)
-
-G = nx.DiGraph()
+    fig = build_class_figure(G, class_locs, class_churns)
+    fig.write_html(output_file)
+    print(f"Saved interactive graph to {output_file}")
 
-# Add inheritance edges
-for child, parent in inheritance:
-    G.add_edge(child, parent, label="inherits")
 
-# Add usage edges
-for user_class, used_classes in usage.items():
-    for used_class in used_classes:
-        G.add_edge(user_class, used_class, label="uses")
+if __name__ == "__main__":
+    inheritance, usage = extract_relations_from_folder("api")
+    short_class_locs = short_name_locs(get_class_locs("api"))
 
-# Draw the graph
-pos = nx.spring_layout(G, seed=42)
-edge_labels = nx.get_edge_attributes(G, "label")
+    churn_by_file = get_churn_by_file("api")
+    class_churn = map_churn_to_classes("api", churn_by_file)
 
-plt.figure(figsize=(14, 10))
-nx.draw(G, pos, with_labels=True, node_size=2000,
-        node_color="lightyellow", font_size=10, arrows=True)
-nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_color="red")
-plt.title("Class Relationships in Zeeguu API (Inheritance + Usage)")
-plt.tight_layout()
-plt.savefig("class_relations.png", dpi=300)  # Save the figure
+    # Inheritance + usage edges, labelled by relation; one layout shared by
+    # the interactive view and the static image
+    G = CompactGraph.from_class_relations(inheritance, usage).to_networkx()
+    render_all(G, {
+        "zeeguu_class_relations.html": dict(
+            figure=build_class_figure, class_locs=short_class_locs, class_churns=class_churn),
+        "class_relations.png": dict(
+            title="Class Relationships in Zeeguu API (Inheritance + Usage)",
+            edge_labels=G.number_of_edges() <= EDGE_LABEL_LIMIT),
+    })
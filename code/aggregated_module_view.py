@@ -1,22 +1,26 @@
 
-import os
-import ast
 import subprocess
 import networkx as nx
 import plotly.graph_objects as go
+from graph_filter import filter_graph
 from collections import defaultdict
+from functools import lru_cache
+from scope import Scope
+from discovery import discover, read_source, read_sources
+from fast_scan import from_imports
 
-EXCLUDED_FILES = {"__init__.py"}
-EXCLUDED_PREFIXES = {"test_", "scripts/", "tools/"}
+# On top of the shared scope (scope.json, .gitignore, defaults)
+EXCLUDED_PATTERNS = ["__init__.py", "test_*", "/scripts/", "/tools/"]
+EXCLUDED_SCOPE = Scope(exclude=EXCLUDED_PATTERNS)
 
 
 def should_exclude(file_path):
-    base = os.path.basename(file_path)
-    if base in EXCLUDED_FILES:
-        return True
-    if any(base.startswith(prefix) or file_path.startswith(prefix) for prefix in EXCLUDED_PREFIXES):
-        return True
-    return False
+    return EXCLUDED_SCOPE.excludes(file_path)
+
+
+@lru_cache(maxsize=None)
+def package_scope(folder_path):
+    return Scope.from_folder(folder_path, exclude=EXCLUDED_PATTERNS)
 
 
 def get_package_name(file_path):
@@ -28,23 +32,15 @@ def get_package_name(file_path):
 
 def get_aggregated_locs(folder_path):
     locs = defaultdict(int)
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py"):
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(
-                    full_path, folder_path).replace("\\", "/")
-                if should_exclude(rel_path):
-                    continue
-                try:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        lines = f.readlines()
-                        loc = sum(1 for line in lines if line.strip()
-                                  and not line.strip().startswith("#"))
-                        pkg = get_package_name(rel_path)
-                        locs[pkg] += loc
-                except Exception as e:
-                    print(f"Error reading {rel_path}: {e}")
+    for entry, source in read_sources(discover(folder_path, package_scope(folder_path))):
+        try:
+            lines = source.splitlines()
+            loc = sum(1 for line in lines if line.strip()
+                      and not line.strip().startswith(b"#"))
+            pkg = get_package_name(entry.rel_path)
+            locs[pkg] += loc
+        except Exception as e:
+            print(f"Error reading {entry.rel_path}: {e}")
     return dict(locs)
 
 
@@ -56,10 +52,13 @@ def get_aggregated_churn(folder_path):
         stderr=subprocess.PIPE,
         text=True
     )
+    # Same scope as the LOC and import scans, so churn never adds packages
+    # that have no size
+    scope = package_scope(folder_path)
     file_changes = result.stdout.splitlines()
     for file in file_changes:
         file = file.strip().replace("\\", "/")
-        if file.endswith(".py") and not should_exclude(file):
+        if file.endswith(".py") and scope.includes(file):
             pkg = get_package_name(file)
             churn[pkg] += 1
     return dict(churn)
@@ -67,31 +66,20 @@ def get_aggregated_churn(folder_path):
 
 def get_package_dependencies(folder_path):
     deps = set()
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py"):
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(
-                    full_path, folder_path).replace("\\", "/")
-                if should_exclude(rel_path):
-                    continue
-                try:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        tree = ast.parse(f.read(), filename=rel_path)
-                        src_pkg = get_package_name(rel_path)
-                        for node in ast.walk(tree):
-                            if isinstance(node, ast.ImportFrom) and node.module and not node.level:
-                                tgt_path = node.module.replace(
-                                    ".", "/") + ".py"
-                                tgt_pkg = get_package_name(tgt_path)
-                                if src_pkg != tgt_pkg:
-                                    deps.add((src_pkg, tgt_pkg))
-                except Exception as e:
-                    print(f"Failed to parse {rel_path}: {e}")
+    for entry in discover(folder_path, package_scope(folder_path)):
+        try:
+            src_pkg = get_package_name(entry.rel_path)
+            for module in from_imports(read_source(entry)):
+                tgt_path = module.replace(".", "/") + ".py"
+                tgt_pkg = get_package_name(tgt_path)
+                if src_pkg != tgt_pkg:
+                    deps.add((src_pkg, tgt_pkg))
+        except Exception as e:
+            print(f"Failed to parse {entry.rel_path}: {e}")
     return list(deps)
 
 
-def visualize_aggregated_module_graph(folder_path, output_file="aggregated_module_view.html"):
+def visualize_aggregated_module_graph(folder_path, output_file="aggregated_module_view.html", view=None):
     locs = get_aggregated_locs(folder_path)
     churn = get_aggregated_churn(folder_path)
     edges = get_package_dependencies(folder_path)
@@ -103,6 +91,10 @@ def visualize_aggregated_module_graph(folder_path, output_file="aggregated_modul
     for src, tgt in edges:
         G.add_edge(src, tgt)
 
+    # Narrow the graph before layout, e.g. view=dict(focus=..., radius=2)
+    if view:
+        G = filter_graph(G, metrics={"loc": locs, "churn": churn}, **view)
+
     pos = nx.spring_layout(G, seed=42)
 
     node_x, node_y, node_size, node_color, node_text = [], [], [], [], []
@@ -151,5 +143,5 @@ def visualize_aggregated_module_graph(folder_path, output_file="aggregated_modul
     print(f"Saved interactive aggregated view to: {output_file}")
 
 
-# Example usage:
-visualize_aggregated_module_graph("api", "aggregated_module_view.html")
+if __name__ == "__main__":
+    visualize_aggregated_module_graph("api", "aggregated_module_view.html")
@@ -0,0 +1,218 @@
+import os
+import re
+import sys
+import json
+import pickle
+import hashlib
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import networkx as nx
+from module_view import get_module_locs, get_module_churn, build_module_figure
+from discovery import discover, read_source
+from fast_scan import scan
+
+CACHE_DIR = ".arch_cache"
+OUTPUT_DIR = "batch_output"
+
+
+def load_manifest(manifest_path):
+    # Either a JSON list of {"name", "path"} entries (or {"repos": [...]}),
+    # or a .gitmodules file; relative paths resolve against its folder.
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if os.path.basename(manifest_path) == ".gitmodules":
+        repos = [{"name": name, "path": path} for name, path in re.findall(
+            r'\[submodule "([^"]+)"\][^\[]*?path\s*=\s*(\S+)', text)]
+    else:
+        data = json.loads(text)
+        repos = data["repos"] if isinstance(data, dict) else data
+    seen = set()
+    for repo in repos:
+        repo.setdefault("name", os.path.basename(os.path.normpath(repo["path"])))
+        repo["path"] = os.path.join(base, repo["path"])
+        # Results, outputs and cache entries are all keyed by name
+        if repo["name"] in seen:
+            raise ValueError(f"duplicate repository name in {manifest_path}: "
+                             f"{repo['name']} (give the entries distinct \"name\"s)")
+        seen.add(repo["name"])
+    return repos
+
+
+def cache_key(repo_path):
+    # HEAD (for churn) plus every analysed file's path, size and mtime, so
+    # edits, additions and deletions all change the key, in or out of git
+    head = subprocess.run(["git", "-C", repo_path, "rev-parse", "HEAD"],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    digest = hashlib.sha1(head.stdout.encode("utf-8"))
+    for entry in discover(repo_path):
+        digest.update(f"{entry.rel_path}\0{entry.size}\0{entry.mtime!r}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_cached(cache_dir, name, stage, key):
+    path = os.path.join(cache_dir, name, f"{stage}.pickle")
+    try:
+        with open(path, "rb") as f:
+            cached = pickle.load(f)
+        if cached["key"] == key:
+            return cached["data"]
+    except (OSError, pickle.PickleError, EOFError, KeyError):
+        pass
+    return None
+
+
+def store_cached(cache_dir, name, stage, key, data):
+    os.makedirs(os.path.join(cache_dir, name), exist_ok=True)
+    with open(os.path.join(cache_dir, name, f"{stage}.pickle"), "wb") as f:
+        pickle.dump({"key": key, "data": data}, f)
+
+
+def import_targets(rel_path, imp):
+    # Candidate module paths of one `from ... import` record; relative
+    # imports resolve against the importing module's package
+    if not imp.level:
+        return [imp.module.replace(".", "/") + ".py"] if imp.module else []
+    package = rel_path.split("/")[:-1]
+    if imp.level - 1 > len(package):
+        return []
+    package = package[:len(package) - (imp.level - 1)]
+    if imp.module:
+        return ["/".join(package + imp.module.split(".")) + ".py"]
+    # from . import a, b: each name may be a sibling module
+    return ["/".join(package + [name]) + ".py" for name in imp.names]
+
+
+def extract_imports(repo_path):
+    imports = defaultdict(set)
+    for entry in discover(repo_path):
+        try:
+            records = scan(read_source(entry)).imports
+        except Exception as e:
+            print(f"Failed to parse {entry.rel_path}: {e}")
+            continue
+        for imp in records:
+            if imp.kind == "from":
+                imports[entry.rel_path].update(import_targets(entry.rel_path, imp))
+    return dict(imports)
+
+
+def extract_repo(repo_path):
+    return {"locs": get_module_locs(repo_path),
+            "imports": extract_imports(repo_path)}
+
+
+def render_repo(name, locs, churn, imports, output_file):
+    G = nx.DiGraph()
+    G.add_nodes_from(set(locs) | set(churn))
+    for src, targets in imports.items():
+        for tgt in targets:
+            if tgt in locs:
+                G.add_edge(src, tgt)
+    fig = build_module_figure(G, locs, churn,
+                              title=f"{name}: Module Dependency View (LOC + Churn)")
+    fig.write_html(output_file)
+    return output_file
+
+
+def resolve_module(target, modules):
+    # "pkg/sub.py" may also be the package "pkg/sub/__init__.py"
+    if target in modules:
+        return target
+    package = target[:-len(".py")] + "/__init__.py"
+    return package if package in modules else None
+
+
+def cross_repo_graph(results):
+    # Nodes are "repo:module/path.py"; an import is attributed to another
+    # repo when its top-level package is one of that repo's packages.
+    owners = {}
+    for name, data in results.items():
+        for module in data["locs"]:
+            if "/" in module:
+                owners.setdefault(module.split("/")[0], name)
+
+    G = nx.DiGraph()
+    for name, data in results.items():
+        for module, loc in data["locs"].items():
+            G.add_node(f"{name}:{module}", repo=name, loc=loc,
+                       churn=data["churn"].get(module, 0))
+        for src, targets in data["imports"].items():
+            for tgt in targets:
+                local = resolve_module(tgt, data["locs"])
+                if local is not None:
+                    G.add_edge(f"{name}:{src}", f"{name}:{local}")
+                    continue
+                owner = owners.get(tgt.split("/")[0])
+                if owner is None or owner == name:
+                    continue
+                remote = resolve_module(tgt, results[owner]["locs"])
+                if remote is not None:
+                    G.add_edge(f"{name}:{src}", f"{owner}:{remote}", cross_repo=True)
+    return G
+
+
+def run_batch(manifest_path, output_dir=OUTPUT_DIR, cache_dir=CACHE_DIR, workers=None):
+    repos = load_manifest(manifest_path)
+    os.makedirs(output_dir, exist_ok=True)
+    results = {repo["name"]: {} for repo in repos}
+    keys = {repo["name"]: cache_key(repo["path"]) for repo in repos}
+
+    # One pool for every stage of every repo: extraction and churn are
+    # submitted up front, rendering as soon as both are in for a repo.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        for repo in repos:
+            name, key = repo["name"], keys[repo["name"]]
+            for stage, func in (("extract", extract_repo), ("churn", get_module_churn)):
+                cached = load_cached(cache_dir, name, stage, key)
+                if cached is None:
+                    pending[pool.submit(func, repo["path"])] = (name, stage)
+                else:
+                    results[name][stage] = cached
+
+        def submit_render(name):
+            data = results[name]
+            output_file = os.path.join(output_dir, f"{name}_module_view.html")
+            return pool.submit(render_repo, name, data["extract"]["locs"],
+                               data["churn"], data["extract"]["imports"], output_file)
+
+        renders = [submit_render(name) for name, data in results.items()
+                   if len(data) == 2]
+        for future in as_completed(pending):
+            name, stage = pending[future]
+            try:
+                results[name][stage] = future.result()
+            except Exception as e:
+                print(f"[!] {stage} failed for {name}: {e}")
+                continue
+            store_cached(cache_dir, name, stage, keys[name], results[name][stage])
+            if len(results[name]) == 2:
+                renders.append(submit_render(name))
+
+        for future in as_completed(renders):
+            try:
+                print(f"Saved {future.result()}")
+            except Exception as e:
+                print(f"[!] Rendering failed: {e}")
+
+    combined = {name: {"locs": data["extract"]["locs"],
+                       "imports": data["extract"]["imports"],
+                       "churn": data["churn"]}
+                for name, data in results.items() if len(data) == 2}
+    G = cross_repo_graph(combined)
+    cross = [(u, v) for u, v, c in G.edges(data="cross_repo") if c]
+    with open(os.path.join(output_dir, "cross_repo_edges.json"), "w") as f:
+        json.dump(cross, f, indent=2)
+    locs = dict(G.nodes(data="loc"))
+    churn = dict(G.nodes(data="churn"))
+    fig = build_module_figure(G, locs, churn,
+                              title="Cross-Repository Module Dependency View")
+    fig.write_html(os.path.join(output_dir, "combined_module_view.html"))
+    print(f"Combined graph: {G.number_of_nodes()} modules, {len(cross)} cross-repo imports")
+    return G
+
+
+if __name__ == "__main__":
+    run_batch(sys.argv[1] if len(sys.argv) > 1 else ".gitmodules")
@@ -0,0 +1,345 @@
+import ast
+import sys
+from array import array
+from collections import Counter, defaultdict
+from compact_graph import CompactGraph, CALLS
+from discovery import discover, read_sources
+
+MODULE_SCOPE = "<module>"
+
+
+def module_name(rel_path):
+    # "pkg/sub/mod.py" -> "pkg.sub.mod", "pkg/__init__.py" -> "pkg"
+    parts = rel_path[:-len(".py")].split("/")
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def _dotted(node):
+    # ["a", "b", "c"] for a.b.c, None for anything that is not a plain chain
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return parts[::-1]
+
+
+class ModuleInfo:
+    """Definitions, imports and unresolved call sites of one file."""
+
+    def __init__(self, rel_path):
+        self.rel_path = rel_path
+        self.name = module_name(rel_path)
+        self.is_package = rel_path.endswith("__init__.py")
+        self.defs = set()  # qualnames: "f", "C", "C.m", "f.inner"
+        self.classes = {}  # class qualname -> base expressions (dotted lists)
+        self.imports = {}  # local alias -> absolute dotted name
+        # (caller qualname, enclosing class or None, enclosing function
+        # qualnames innermost first, dotted callee expression)
+        self.calls = []
+
+
+class CallSiteExtractor(ast.NodeVisitor):
+    def __init__(self, info):
+        self.info = info
+        self.scope = []  # qualname parts
+        self.functions = []  # qualnames of the enclosing functions
+        self.current_class = None
+        # Per function: local variable -> dotted class expression (x = Foo())
+        self.locals = [{}]
+
+    def _qualname(self, name):
+        return ".".join(self.scope + [name])
+
+    def _absolute(self, module, level):
+        if not level:
+            return module
+        package = self.info.name.split(".")
+        if not self.info.is_package:
+            package = package[:-1]
+        if level > 1:
+            package = package[:-(level - 1)]
+        return ".".join(package + ([module] if module else []))
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.asname:
+                self.info.imports[alias.asname] = alias.name
+            else:
+                head = alias.name.split(".")[0]
+                self.info.imports[head] = head
+
+    def visit_ImportFrom(self, node):
+        base = self._absolute(node.module, node.level)
+        for alias in node.names:
+            if alias.name != "*":
+                self.info.imports[alias.asname or alias.name] = f"{base}.{alias.name}"
+
+    def visit_ClassDef(self, node):
+        qualname = self._qualname(node.name)
+        self.info.defs.add(qualname)
+        self.info.classes[qualname] = [d for d in map(_dotted, node.bases) if d]
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        outer_class, self.current_class = self.current_class, qualname
+        self.scope.append(node.name)
+        for stmt in node.body:
+            self.visit(stmt)
+        self.scope.pop()
+        self.current_class = outer_class
+
+    def visit_FunctionDef(self, node):
+        qualname = self._qualname(node.name)
+        self.info.defs.add(qualname)
+        for expr in node.decorator_list + node.args.defaults + node.args.kw_defaults:
+            if expr is not None:
+                self.visit(expr)
+        # Methods see their class through self/cls; nested functions keep
+        # the class of the method they are defined in
+        self.scope.append(node.name)
+        self.functions.append(qualname)
+        self.locals.append({})
+        for stmt in node.body:
+            self.visit(stmt)
+        self.locals.pop()
+        self.functions.pop()
+        self.scope.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Assign(self, node):
+        # Track simple instantiations: x = ClassName() / x = mod.ClassName()
+        if isinstance(node.value, ast.Call):
+            expr = _dotted(node.value.func)
+            if expr:
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        self.locals[-1][target.id] = expr
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        expr = _dotted(node.func)
+        if expr is None and isinstance(node.func, ast.Attribute):
+            # super().m()
+            value = node.func.value
+            if (isinstance(value, ast.Call) and isinstance(value.func, ast.Name)
+                    and value.func.id == "super"):
+                expr = ["super", node.func.attr]
+        if expr:
+            if len(expr) > 1 and expr[0] in self.locals[-1]:
+                expr = ["<instance>", *self.locals[-1][expr[0]], *expr[1:]]
+            if self.functions:
+                caller = self.functions[-1]
+            else:
+                caller = self.current_class or MODULE_SCOPE
+            self.info.calls.append(
+                (caller, self.current_class, tuple(self.functions[::-1]), tuple(expr)))
+        self.generic_visit(node)
+
+
+class CallGraph:
+    """Function/method call graph over a CompactGraph of "path.py:qualname" nodes.
+
+    Callers that are not functions are "path.py:Class" (class body) or
+    "path.py:<module>" (module body). Calls into code outside the analysed
+    folder (stdlib, third-party) are not recorded.
+    """
+
+    def __init__(self):
+        self.graph = CompactGraph()
+        self.modules = {}  # dotted module name -> ModuleInfo
+        self.classes = set()  # node names of classes
+        # Call sites per edge, aligned with the graph's CSR targets
+        self.sites = array("i")
+
+    def add_module(self, info):
+        self.modules[info.name] = info
+        for qualname in info.classes:
+            self.classes.add(f"{info.rel_path}:{qualname}")
+
+    def _split(self, dotted):
+        # Longest prefix of `dotted` that is an analysed module
+        for i in range(len(dotted), 0, -1):
+            info = self.modules.get(".".join(dotted[:i]))
+            if info is not None:
+                return info, dotted[i:]
+        return None, dotted
+
+    def _lookup(self, info, names, seen=None):
+        # A dotted name as seen from inside `info`: local definition first,
+        # then whatever it was imported as. Returns (ModuleInfo, qualname).
+        head, rest = names[0], list(names[1:])
+        if head in info.defs:
+            return self._member(info, [head] + rest)
+        target = info.imports.get(head)
+        if target is None:
+            return None
+        seen = seen or set()
+        key = (info.name, head)
+        if key in seen:
+            return None
+        seen.add(key)
+        module, qual = self._split(target.split(".") + rest)
+        if module is None or not qual:
+            return None
+        if module is info and qual[0] == head:
+            return self._member(info, qual)
+        return self._lookup(module, qual, seen)  # follows re-exports
+
+    def _member(self, info, qual):
+        # qual[0] is defined in info; walk into classes, honouring bases
+        if len(qual) == 1 or ".".join(qual) in info.defs:
+            return info, ".".join(qual)
+        owner = ".".join(qual[:-1])
+        if owner in info.classes:
+            return self._method(info, owner, qual[-1])
+        return None
+
+    def _method(self, info, class_qual, name, depth=0):
+        if f"{class_qual}.{name}" in info.defs:
+            return info, f"{class_qual}.{name}"
+        if depth > 20:
+            return None
+        for base in info.classes.get(class_qual, ()):
+            resolved = self._lookup(info, base)
+            if resolved and resolved[1] in resolved[0].classes:
+                found = self._method(resolved[0], resolved[1], name, depth + 1)
+                if found:
+                    return found
+        return None
+
+    def _resolve_call(self, info, current_class, functions, expr):
+        head = expr[0]
+        if head in ("self", "cls") and current_class and len(expr) == 2:
+            return self._method(info, current_class, expr[1])
+        if head == "super" and current_class and len(expr) == 2:
+            for base in info.classes.get(current_class, ()):
+                resolved = self._lookup(info, base)
+                if resolved and resolved[1] in resolved[0].classes:
+                    found = self._method(resolved[0], resolved[1], expr[1])
+                    if found:
+                        return found
+            return None
+        if head == "<instance>":
+            expr = expr[1:]
+        elif len(expr) == 1:
+            # Nested functions shadow module-level names
+            for function in functions:
+                if f"{function}.{head}" in info.defs:
+                    return info, f"{function}.{head}"
+        resolved = self._lookup(info, expr)
+        if resolved and resolved[1] in resolved[0].classes:
+            # Instantiation: attribute to __init__ when it is defined
+            return self._method(*resolved, "__init__") or resolved
+        return resolved
+
+    def resolve(self):
+        # The graph keeps one edge per caller/callee pair; how many call
+        # sites each edge stands for goes into self.sites
+        graph, sites = self.graph, Counter()
+        for info in self.modules.values():
+            for qualname in info.defs:
+                graph.add_node(f"{info.rel_path}:{qualname}")
+            for caller, current_class, functions, expr in info.calls:
+                resolved = self._resolve_call(info, current_class, functions, expr)
+                if resolved is not None:
+                    src = graph.intern(f"{info.rel_path}:{caller}")
+                    dst = graph.intern(f"{resolved[0].rel_path}:{resolved[1]}")
+                    graph.add_edge(graph.names[src], graph.names[dst], CALLS)
+                    sites[(src, dst)] += 1
+            info.calls = []
+        offsets, targets, _ = graph.csr()
+        self.sites = array("i", (sites[(s, targets[p])]
+                                 for s in range(len(graph))
+                                 for p in range(offsets[s], offsets[s + 1])))
+        return self
+
+    def owner_class(self, node):
+        # Node name of the class a method (or nested function) belongs to
+        module, _, qualname = node.partition(":")
+        parts = qualname.split(".")
+        for i in range(len(parts), 0, -1):
+            candidate = f"{module}:{'.'.join(parts[:i])}"
+            if candidate in self.classes:
+                return candidate
+        return None
+
+    def rollup(self, key, sites=True):
+        # {(src_group, dst_group): call sites} between groups, where key(node)
+        # names a node's group (None drops it); with sites=False, the number
+        # of distinct caller -> callee function pairs instead. Group ids are
+        # computed once per node, then the CSR arrays are scanned as ints.
+        offsets, targets, _ = self.graph.csr()
+        weights = self.sites if sites else None
+        groups = [key(name) for name in self.graph.names]
+        counts = Counter()
+        for s, group in enumerate(groups):
+            if group is None:
+                continue
+            for p in range(offsets[s], offsets[s + 1]):
+                target = groups[targets[p]]
+                if target is not None and target != group:
+                    counts[(group, target)] += weights[p] if weights else 1
+        return counts
+
+    def module_calls(self, sites=True):
+        # Keyed by rel_path, like the nodes of the module view
+        return self.rollup(lambda node: node.partition(":")[0], sites)
+
+    def class_calls(self, sites=True):
+        # Keyed by "module.path.Class", like get_class_locs
+        def key(node):
+            owner = self.owner_class(node)
+            if owner is None:
+                return None
+            module, _, qualname = owner.partition(":")
+            return f"{module.replace('/', '.').replace('.py', '')}.{qualname}"
+        return self.rollup(key, sites)
+
+    def class_usage(self):
+        # Same shape as ClassUsageExtractor.usage (short class names), so it
+        # can go straight into advanced.save_plotly_graph
+        usage = defaultdict(set)
+        for src, dst in self.class_calls(sites=False):
+            usage[src.split(".")[-1]].add(dst.split(".")[-1])
+        return usage
+
+    def hot_paths(self, n=20):
+        # Most-called callees by number of distinct callers
+        offsets, targets, _ = self.graph.csr()
+        fan_in = array("i", bytes(4 * len(self.graph)))
+        for p in range(len(targets)):
+            fan_in[targets[p]] += 1
+        ranked = sorted(range(len(fan_in)), key=fan_in.__getitem__, reverse=True)
+        return [(self.graph.names[i], fan_in[i]) for i in ranked[:n] if fan_in[i]]
+
+
+def build_call_graph(folder_path):
+    call_graph = CallGraph()
+    for entry, source in read_sources(discover(folder_path)):
+        info = ModuleInfo(entry.rel_path)
+        try:
+            tree = ast.parse(source, filename=entry.full_path)
+        except Exception as e:
+            print(f"[!] Skipped {entry.full_path}: {e}")
+            continue
+        CallSiteExtractor(info).visit(tree)
+        call_graph.add_module(info)
+    return call_graph.resolve()
+
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else "api"
+    call_graph = build_call_graph(folder)
+    print(f"{len(call_graph.graph)} functions, {call_graph.graph.number_of_edges()} "
+          f"caller -> callee pairs, {sum(call_graph.sites)} call sites")
+    print("\nMost called (distinct callers):")
+    for name, callers in call_graph.hot_paths():
+        print(f"  {callers:5d}  {name}")
+    print("\nMost coupled modules (call sites):")
+    for (src, dst), calls in call_graph.module_calls().most_common(20):
+        print(f"  {calls:5d}  {src} -> {dst}")
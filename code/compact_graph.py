@@ -0,0 +1,339 @@
+from array import array
+from collections import deque
+
+# Relation codes stored per edge (one byte each)
+INHERITS = 0
+USES = 1
+IMPORTS = 2
+CALLS = 3
+RELATIONS = ("inherits", "uses", "imports", "calls")
+RELATION_CODES = {name: code for code, name in enumerate(RELATIONS)}
+
+
+def _distinct(ids):
+    # Number of distinct values in a grouped run of ids
+    return sum(1 for i in range(len(ids)) if not i or ids[i] != ids[i - 1])
+
+
+def _merge_rows(n, offsets, targets, relations, pending):
+    # Sorted CSR rows with pending {row: {(target, relation)}} merged in.
+    # Only the rows that gained edges are re-sorted; the spans between them
+    # are copied as slices.
+    if len(offsets) < n + 1:
+        # Nodes interned since the last freeze start with empty rows
+        offsets = offsets + array("i", [offsets[-1]]) * (n + 1 - len(offsets))
+    new_offsets = array("i", [0])
+    new_targets = array("i")
+    new_relations = array("b")
+    prev = delta = 0
+    for i in sorted(pending):
+        # Unchanged rows prev..i-1, shifted by the edges added so far
+        new_targets.extend(targets[offsets[prev]:offsets[i]])
+        new_relations.extend(relations[offsets[prev]:offsets[i]])
+        new_offsets.extend(offsets[prev + 1:i + 1] if not delta
+                           else array("i", (x + delta for x in offsets[prev + 1:i + 1])))
+        start, end = offsets[i], offsets[i + 1]
+        row = pending[i]
+        row.update(zip(targets[start:end], relations[start:end]))
+        for d, r in sorted(row):
+            new_targets.append(d)
+            new_relations.append(r)
+        new_offsets.append(len(new_targets))
+        delta += len(row) - (end - start)
+        prev = i + 1
+    new_targets.extend(targets[offsets[prev]:])
+    new_relations.extend(relations[offsets[prev]:])
+    new_offsets.extend(offsets[prev + 1:] if not delta
+                       else array("i", (x + delta for x in offsets[prev + 1:])))
+    return new_offsets, new_targets, new_relations
+
+
+class CompactGraph:
+    """Directed graph with interned node names and CSR-packed, typed edges."""
+
+    def __init__(self):
+        self.names = []  # id -> name
+        self.ids = {}  # name -> id
+        # Edges added since the last freeze (COO form)
+        self._src = array("i")
+        self._dst = array("i")
+        self._rel = array("b")
+        # Frozen CSR form: row i spans targets[offsets[i]:offsets[i + 1]]
+        self._offsets = array("i", [0])
+        self._targets = array("i")
+        self._relations = array("b")
+        # Reverse CSR, built lazily for predecessor queries
+        self._rev = None
+
+    def intern(self, name):
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = len(self.names)
+            self.ids[name] = node_id
+            self.names.append(name)
+        return node_id
+
+    def add_node(self, name):
+        return self.intern(name)
+
+    def add_edge(self, src, dst, relation="uses"):
+        code = relation if isinstance(relation, int) else RELATION_CODES[relation]
+        self._src.append(self.intern(src))
+        self._dst.append(self.intern(dst))
+        self._rel.append(code)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def number_of_edges(self):
+        self.freeze()
+        return len(self._targets)
+
+    def freeze(self):
+        # Fold pending edges into the CSR arrays; duplicates (same src, dst
+        # and relation) are dropped like nx.DiGraph.add_edge would.
+        n = len(self.names)
+        if not self._src and len(self._offsets) == n + 1:
+            return self
+        if len(self._src) >= len(self._targets):
+            return self._rebuild()
+
+        # A few edges on a big graph: merge them into the rows they touch,
+        # and into the reverse index too when it has been built
+        forward, backward = {}, {}
+        for s, d, r in zip(self._src, self._dst, self._rel):
+            forward.setdefault(s, set()).add((d, r))
+            backward.setdefault(d, set()).add((s, r))
+        self._offsets, self._targets, self._relations = _merge_rows(
+            n, self._offsets, self._targets, self._relations, forward)
+        if self._rev is not None:
+            self._rev = _merge_rows(n, *self._rev, backward)
+        self._src, self._dst, self._rel = array("i"), array("i"), array("b")
+        return self
+
+    def _rebuild(self):
+        # Full counting-sort build, for the first freeze or large batches
+        n = len(self.names)
+        src, dst, rel = self._src, self._dst, self._rel
+        for i in range(len(self._offsets) - 1):
+            for p in range(self._offsets[i], self._offsets[i + 1]):
+                src.append(i)
+                dst.append(self._targets[p])
+                rel.append(self._relations[p])
+
+        # Counting sort by source
+        offsets = array("i", bytes(4 * (n + 1)))
+        for s in src:
+            offsets[s + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        fill = array("i", offsets[:-1])
+        targets = array("i", bytes(4 * len(src)))
+        relations = array("b", bytes(len(src)))
+        for s, d, r in zip(src, dst, rel):
+            p = fill[s]
+            targets[p] = d
+            relations[p] = r
+            fill[s] = p + 1
+
+        # Sort and dedupe each row
+        packed_offsets = array("i", [0])
+        packed_targets = array("i")
+        packed_relations = array("b")
+        for i in range(n):
+            row = sorted(set(zip(targets[offsets[i]:offsets[i + 1]],
+                                 relations[offsets[i]:offsets[i + 1]])))
+            for d, r in row:
+                packed_targets.append(d)
+                packed_relations.append(r)
+            packed_offsets.append(len(packed_targets))
+
+        self._offsets = packed_offsets
+        self._targets = packed_targets
+        self._relations = packed_relations
+        self._src, self._dst, self._rel = array("i"), array("i"), array("b")
+        self._rev = None
+        return self
+
+    def _reverse(self):
+        # freeze() merges new edges into a built reverse index, or drops it
+        self.freeze()
+        if self._rev is None:
+            n = len(self.names)
+            offsets = array("i", bytes(4 * (n + 1)))
+            for d in self._targets:
+                offsets[d + 1] += 1
+            for i in range(n):
+                offsets[i + 1] += offsets[i]
+            fill = array("i", offsets[:-1])
+            sources = array("i", bytes(4 * len(self._targets)))
+            relations = array("b", bytes(len(self._targets)))
+            for s in range(n):
+                for p in range(self._offsets[s], self._offsets[s + 1]):
+                    d = self._targets[p]
+                    q = fill[d]
+                    sources[q] = s
+                    relations[q] = self._relations[p]
+                    fill[d] = q + 1
+            self._rev = (offsets, sources, relations)
+        return self._rev
+
+    def successor_ids(self, node_id, relation=None):
+        self.freeze()
+        start, end = self._offsets[node_id], self._offsets[node_id + 1]
+        if relation is None:
+            return self._targets[start:end]
+        code = relation if isinstance(relation, int) else RELATION_CODES[relation]
+        return array("i", (self._targets[p] for p in range(start, end)
+                           if self._relations[p] == code))
+
+    def predecessor_ids(self, node_id, relation=None):
+        offsets, sources, relations = self._reverse()
+        start, end = offsets[node_id], offsets[node_id + 1]
+        if relation is None:
+            return sources[start:end]
+        code = relation if isinstance(relation, int) else RELATION_CODES[relation]
+        return array("i", (sources[p] for p in range(start, end)
+                           if relations[p] == code))
+
+    def neighbors(self, name, relation=None):
+        # A pair linked by several relations is listed once
+        names = self.names
+        ids = dict.fromkeys(self.successor_ids(self.ids[name], relation))
+        return [names[i] for i in ids]
+
+    def predecessors(self, name, relation=None):
+        names = self.names
+        ids = dict.fromkeys(self.predecessor_ids(self.ids[name], relation))
+        return [names[i] for i in ids]
+
+    def out_degree(self, name):
+        # Distinct neighbours, like neighbors() and nx.DiGraph; rows are
+        # sorted, so a pair with several relations is a run of equal ids
+        return _distinct(self.successor_ids(self.ids[name]))
+
+    def in_degree(self, name):
+        return _distinct(self.predecessor_ids(self.ids[name]))
+
+    def reachable(self, name, reverse=False, relation=None):
+        # BFS over the CSR arrays; returns every node reachable from `name`
+        # (or that can reach it when reverse=True), excluding itself.
+        step = self.predecessor_ids if reverse else self.successor_ids
+        start = self.ids[name]
+        seen = bytearray(len(self.names))
+        seen[start] = 1
+        queue = deque([start])
+        found = []
+        while queue:
+            for nxt in step(queue.popleft(), relation):
+                if not seen[nxt]:
+                    seen[nxt] = 1
+                    found.append(nxt)
+                    queue.append(nxt)
+        return [self.names[i] for i in found]
+
+    def has_path(self, src, dst, relation=None):
+        # Same BFS as reachable(), stopping as soon as dst is seen
+        start, goal = self.ids[src], self.ids[dst]
+        if start == goal:
+            return True
+        seen = bytearray(len(self.names))
+        seen[start] = 1
+        queue = deque([start])
+        while queue:
+            for nxt in self.successor_ids(queue.popleft(), relation):
+                if nxt == goal:
+                    return True
+                if not seen[nxt]:
+                    seen[nxt] = 1
+                    queue.append(nxt)
+        return False
+
+    def shortest_path(self, src, dst, relation=None):
+        # Unweighted BFS; returns the node names from src to dst or None
+        start, goal = self.ids[src], self.ids[dst]
+        parent = {start: start}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if node == goal:
+                path = [node]
+                while node != start:
+                    node = parent[node]
+                    path.append(node)
+                return [self.names[i] for i in reversed(path)]
+            for nxt in self.successor_ids(node, relation):
+                if nxt not in parent:
+                    parent[nxt] = node
+                    queue.append(nxt)
+        return None
+
+    def edges(self, relation=None):
+        self.freeze()
+        names = self.names
+        code = None if relation is None else RELATION_CODES.get(relation, relation)
+        for s in range(len(names)):
+            for p in range(self._offsets[s], self._offsets[s + 1]):
+                r = self._relations[p]
+                if code is None or r == code:
+                    yield names[s], names[self._targets[p]], RELATIONS[r]
+
+    def to_networkx(self, edge_attr="relation"):
+        import networkx as nx
+
+        # A DiGraph keeps one edge per pair, so a pair linked by several
+        # relations gets them "+"-joined, e.g. "inherits+uses"
+        G = nx.DiGraph()
+        G.add_nodes_from(self.names)
+        for src, dst, relation in self.edges():
+            data = G.get_edge_data(src, dst)
+            if data is not None:
+                relation = f"{data[edge_attr]}+{relation}"
+            G.add_edge(src, dst, **{edge_attr: relation})
+        return G
+
+    @classmethod
+    def from_csr(cls, names, offsets, targets, relations):
+        # Adopt already sorted, deduplicated CSR arrays as-is (see graph_io)
+        graph = cls()
+        graph.names = list(names)
+        graph.ids = {name: i for i, name in enumerate(graph.names)}
+        graph._offsets, graph._targets, graph._relations = offsets, targets, relations
+        return graph
+
+    def csr(self):
+        self.freeze()
+        return self._offsets, self._targets, self._relations
+
+    @classmethod
+    def from_networkx(cls, G, edge_attr="relation", default="uses"):
+        graph = cls()
+        for node in G.nodes():
+            graph.add_node(node)
+        for src, dst, data in G.edges(data=True):
+            for relation in data.get(edge_attr, default).split("+"):
+                graph.add_edge(src, dst, relation)
+        return graph.freeze()
+
+    @classmethod
+    def from_class_relations(cls, inheritance, usage):
+        # Same inputs as advanced.save_plotly_graph
+        graph = cls()
+        for child, parent in inheritance:
+            graph.add_edge(child, parent, INHERITS)
+        for user_class, used_classes in usage.items():
+            for used_class in used_classes:
+                graph.add_edge(user_class, used_class, USES)
+        return graph.freeze()
+
+    @classmethod
+    def from_edges(cls, edges, relation="imports", nodes=()):
+        graph = cls()
+        for node in nodes:
+            graph.add_node(node)
+        for src, dst in edges:
+            graph.add_edge(src, dst, relation)
+        return graph.freeze()
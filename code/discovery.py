@@ -0,0 +1,110 @@
+import os
+import subprocess
+from functools import lru_cache
+from typing import NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+from scope import load_scope
+
+
+class FileEntry(NamedTuple):
+    rel_path: str  # always "/"-separated, relative to the analysed folder
+    full_path: str
+    size: int
+    mtime: float
+
+
+def git_python_files(folder_path):
+    # Tracked and untracked-but-not-ignored .py files relative to
+    # folder_path, or None outside a work tree
+    result = subprocess.run(
+        ["git", "-C", folder_path, "ls-files", "-z", "--cached", "--others",
+         "--exclude-standard", "--", "*.py"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    if result.returncode != 0:
+        return None
+    return [p for p in result.stdout.decode("utf-8", "surrogateescape").split("\0") if p]
+
+
+def scan_python_files(folder_path, scope):
+    # os.scandir walk that never enters excluded directories
+    stack = [("", folder_path)]
+    while stack:
+        prefix, path = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError as e:
+            print(f"[!] Cannot list {path}: {e}")
+            continue
+        for entry in entries:
+            rel_path = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not scope.excludes(rel_path, is_dir=True):
+                    stack.append((rel_path + "/", entry.path))
+            elif entry.name.endswith(".py") and scope.includes(rel_path):
+                yield rel_path, entry.path, entry.stat()
+
+
+def build_manifest(folder_path, scope=None):
+    scope = scope or load_scope(folder_path)
+    tracked = git_python_files(folder_path)
+    if not tracked:
+        # Outside a work tree, or a folder git ignores entirely
+        files = scan_python_files(folder_path, scope)
+    else:
+        # git already honours .gitignore; the scope adds the rest
+        files = ((p, os.path.join(folder_path, p)) for p in tracked if scope.includes(p))
+        files = ((p, full, os.stat(full)) for p, full in files if os.path.isfile(full))
+    manifest = [FileEntry(rel, full, st.st_size, st.st_mtime) for rel, full, st in files]
+    manifest.sort()
+    return tuple(manifest)
+
+
+_manifests = {}
+
+
+def discover(folder_path, scope=None):
+    # One manifest per (folder, scope) for the lifetime of the process, so
+    # every stage of a script lists the tree once
+    key = (os.path.abspath(folder_path), scope)
+    if key not in _manifests:
+        _manifests[key] = build_manifest(folder_path, scope)
+    return _manifests[key]
+
+
+def clear_manifests():
+    _manifests.clear()
+    _read.cache_clear()
+
+
+@lru_cache(maxsize=4096)
+def _read(full_path, size, mtime):
+    with open(full_path, "rb") as f:
+        return f.read()
+
+
+def read_source(entry):
+    # Raw bytes: ast.parse honours the coding cookie itself, and LOC counting
+    # works on bytes lines, so nothing is decoded and re-joined
+    return _read(entry.full_path, entry.size, entry.mtime)
+
+
+def _try_read(entry):
+    try:
+        return read_source(entry)
+    except OSError as e:
+        return e
+
+
+def read_sources(entries, workers=8):
+    # Bulk read with overlapping I/O, yielding (entry, bytes) in the order
+    # of `entries`; files that cannot be read are reported and skipped.
+    # Later read_source() calls for the same files hit the cache.
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for entry, source in zip(entries, pool.map(_try_read, entries)):
+            if isinstance(source, OSError):
+                print(f"[!] Cannot read {entry.rel_path}: {source}")
+                continue
+            yield entry, source
@@ -0,0 +1,148 @@
+import re
+import ast
+from typing import NamedTuple
+
+
+class ImportRecord(NamedTuple):
+    kind: str  # "from" or "import"
+    module: str  # "" for "from . import x"
+    level: int  # leading dots of a relative import
+    names: tuple
+    lineno: int
+
+
+class ClassHeader(NamedTuple):
+    name: str
+    bases: tuple  # last component of simple (dotted) bases, as ast would give
+    lineno: int
+    top_level: bool
+
+
+class ScanResult(NamedTuple):
+    imports: list
+    classes: list
+
+
+# One pass over the raw bytes: comments and string literals are consumed
+# whole so their contents are never mistaken for statements, leaving only
+# `from` / `import` / `class` at the start of a line.
+_LEXER = re.compile(rb"""
+      \#[^\n]*
+    | \"\"\"(?:\\.|[^\\])*?\"\"\"
+    | '''(?:\\.|[^\\])*?'''
+    | "(?:\\.|[^"\\\n])*"
+    | '(?:\\.|[^'\\\n])*'
+    | ^(?P<indent>[ \t]*)(?P<kw>from|import|class)\b
+""", re.M | re.S | re.X)
+
+# A parenthesised name list may hold comments, which may hold ")"
+_FROM = re.compile(
+    rb"from\b[ \t]*(\.*)[ \t]*([\w.]*)[ \t]*\bimport\b[ \t]*"
+    rb"(\((?:\#[^\n]*|[^)#])*\)|(?:[^\n#;\\]|\\\r?\n)*)")
+_IMPORT = re.compile(rb"import\b[ \t]*((?:[^\n#;\\]|\\\r?\n)*)")
+_CLASS = re.compile(rb"class[ \t]+(\w+)[ \t]*(?:\(([^()]*)\))?[ \t]*:")
+_DOTTED = re.compile(r"[\w.]+")
+
+
+class ScanError(ValueError):
+    pass
+
+
+def _names(text):
+    names = []
+    text = re.sub(r"#[^\n]*", "", text).replace("\\\n", " ")
+    for part in text.strip().strip("()").split(","):
+        part = part.strip()
+        if part:
+            names.append(part.split()[0])
+    return tuple(names)
+
+
+def _bases(text):
+    # Only commas outside brackets separate bases: Base[K, V] is one
+    # (subscripted, so skipped like ast.Subscript in _scan_ast)
+    text = re.sub(r"#[^\n]*", "", (text or b"").decode("utf-8"))
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        if ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            depth -= 1
+        elif ch == "," and not depth:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    bases = []
+    for part in parts:
+        part = part.strip().replace("\\\n", "").strip()
+        if _DOTTED.fullmatch(part):
+            bases.append(part.split(".")[-1])
+    return tuple(bases)
+
+
+def _scan_regex(source):
+    imports, classes = [], []
+    line, last = 1, 0
+    for m in _LEXER.finditer(source):
+        kw = m.group("kw")
+        if kw is None:
+            continue
+        pos = m.start("kw")
+        line += source.count(b"\n", last, pos)
+        last = pos
+        top_level = not m.group("indent")
+        if kw == b"from":
+            stmt = _FROM.match(source, pos)
+            if stmt is None:
+                raise ScanError(f"unrecognised from-import on line {line}")
+            imports.append(ImportRecord(
+                "from", stmt.group(2).decode("utf-8"), len(stmt.group(1)),
+                _names(stmt.group(3).decode("utf-8")), line))
+        elif kw == b"import":
+            stmt = _IMPORT.match(source, pos)
+            if stmt is None:
+                raise ScanError(f"unrecognised import on line {line}")
+            for name in _names(stmt.group(1).decode("utf-8")):
+                imports.append(ImportRecord("import", name, 0, (name,), line))
+        else:
+            stmt = _CLASS.match(source, pos)
+            if stmt is None:
+                # Nested parentheses in the bases; let ast sort it out
+                raise ScanError(f"unrecognised class header on line {line}")
+            classes.append(ClassHeader(
+                stmt.group(1).decode("utf-8"), _bases(stmt.group(2)), line, top_level))
+    return ScanResult(imports, classes)
+
+
+def _scan_ast(source):
+    imports, classes = [], []
+    tree = ast.parse(source)
+    top = set(id(node) for node in tree.body)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            imports.append(ImportRecord("from", node.module or "", node.level,
+                                        tuple(a.name for a in node.names), node.lineno))
+        elif isinstance(node, ast.Import):
+            for a in node.names:
+                imports.append(ImportRecord("import", a.name, 0, (a.name,), node.lineno))
+        elif isinstance(node, ast.ClassDef):
+            bases = tuple(b.id if isinstance(b, ast.Name) else b.attr
+                          for b in node.bases if isinstance(b, (ast.Name, ast.Attribute)))
+            classes.append(ClassHeader(node.name, bases, node.lineno, id(node) in top))
+    return ScanResult(imports, classes)
+
+
+def scan(source):
+    # Imports and class headers of one file (bytes). Falls back to a full
+    # ast.parse only when the regex pass meets something it cannot read.
+    try:
+        return _scan_regex(source)
+    except (ScanError, UnicodeDecodeError):
+        return _scan_ast(source)
+
+
+def from_imports(source):
+    # Absolute `from x.y import ...` modules, the only imports the module
+    # and package views follow
+    return [imp.module for imp in scan(source).imports
+            if imp.kind == "from" and imp.module and not imp.level]
@@ -2,6 +2,7 @@
 import os
 import ast
 import subprocess
+from discovery import discover, read_source
 
 TOP_N = 15
 
@@ -11,49 +12,40 @@ def extract_class_relations(folder_path):
     inheritance_edges = []
     class_files = {}
 
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py"):
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(
-                    full_path, folder_path).replace("\\", "/")
-                try:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        tree = ast.parse(f.read())
-                        for node in ast.walk(tree):
-                            if isinstance(node, ast.ClassDef):
-                                class_files[node.name] = rel_path
-                                for base in node.bases:
-                                    if isinstance(base, ast.Name):
-                                        inheritance_edges.append(
-                                            (node.name, base.id))
-                            elif isinstance(node, ast.Assign):
-                                if isinstance(node.value, ast.Call) and isinstance(node.value.func, ast.Name):
-                                    if hasattr(node.targets[0], 'id'):
-                                        usage_edges.append(
-                                            (rel_path, node.value.func.id))
-                except:
-                    continue
+    for entry in discover(folder_path):
+        try:
+            tree = ast.parse(read_source(entry))
+            for node in ast.walk(tree):
+                if isinstance(node, ast.ClassDef):
+                    class_files[node.name] = entry.rel_path
+                    for base in node.bases:
+                        if isinstance(base, ast.Name):
+                            inheritance_edges.append(
+                                (node.name, base.id))
+                elif isinstance(node, ast.Assign):
+                    if isinstance(node.value, ast.Call) and isinstance(node.value.func, ast.Name):
+                        if hasattr(node.targets[0], 'id'):
+                            usage_edges.append(
+                                (entry.rel_path, node.value.func.id))
+        except:
+            continue
     return class_files, inheritance_edges, usage_edges
 
 
 def compute_class_locs(folder_path):
     locs = {}
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py"):
-                full_path = os.path.join(root, file)
-                try:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        lines = f.readlines()
-                        loc = sum(1 for line in lines if line.strip()
-                                  and not line.strip().startswith("#"))
-                        tree = ast.parse("".join(lines))
-                        for node in ast.walk(tree):
-                            if isinstance(node, ast.ClassDef):
-                                locs[node.name] = loc
-                except:
-                    continue
+    for entry in discover(folder_path):
+        try:
+            source = read_source(entry)
+            lines = source.splitlines()
+            loc = sum(1 for line in lines if line.strip()
+                      and not line.strip().startswith(b"#"))
+            tree = ast.parse(source)
+            for node in ast.walk(tree):
+                if isinstance(node, ast.ClassDef):
+                    locs[node.name] = loc
+        except:
+            continue
     return locs
 
 
@@ -0,0 +1,72 @@
+from collections import deque
+from scope import compile_patterns
+
+
+def compile_globs(patterns):
+    # Same gitignore-style dialect as scope.json: "*" stays within one path
+    # segment, "**" crosses them. None when there is nothing to match.
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return compile_patterns(patterns)
+
+
+def ego_nodes(G, focus, radius=1, direction="both"):
+    # k-hop neighbourhood of `focus` without building an undirected copy
+    # of the whole graph (which nx.ego_graph(undirected=True) does)
+    roots = [focus] if isinstance(focus, str) else list(focus)
+    depth = {node: 0 for node in roots if node in G}
+    queue = deque(depth)
+    while queue:
+        node = queue.popleft()
+        if depth[node] == radius:
+            continue
+        steps = []
+        if direction in ("out", "both"):
+            steps.append(G.successors(node))
+        if direction in ("in", "both"):
+            steps.append(G.predecessors(node))
+        for step in steps:
+            for nxt in step:
+                if nxt not in depth:
+                    depth[nxt] = depth[node] + 1
+                    queue.append(nxt)
+    return set(depth)
+
+
+def filter_graph(G, focus=None, radius=1, direction="both", include=None,
+                 exclude=None, relations=None, relation_attr="relation",
+                 min_degree=0, metric=None, min_metric=None, metrics=None):
+    """Return the subgraph of G to lay out and render.
+
+    Stages run cheapest first: edge types, name globs, the ego network
+    around `focus`, then degree and metric thresholds on what is left.
+    `metric` is a {node: value} dict or a key into `metrics`.
+    """
+    if relations is not None:
+        relations = {relations} if isinstance(relations, str) else set(relations)
+        # A pair linked by several relations carries them "+"-joined
+        # (see CompactGraph.to_networkx)
+        H = G.edge_subgraph(
+            (u, v) for u, v, r in G.edges(data=relation_attr)
+            if r is not None and relations.intersection(r.split("+"))).copy()
+        H.add_nodes_from(G.nodes(data=True))
+        G = H
+
+    include_re, exclude_re = compile_globs(include), compile_globs(exclude)
+    nodes = [n for n in G.nodes()
+             if (include_re is None or include_re.match(str(n)))
+             and (exclude_re is None or not exclude_re.match(str(n)))]
+    G = G.subgraph(nodes)
+
+    if focus is not None:
+        G = G.subgraph(ego_nodes(G, focus, radius, direction))
+
+    if min_degree:
+        G = G.subgraph(n for n, d in G.degree() if d >= min_degree)
+
+    if metric is not None and min_metric is not None:
+        if isinstance(metric, str):
+            metric = metrics[metric]
+        G = G.subgraph(n for n in G.nodes() if metric.get(n, 0) >= min_metric)
+
+    return G.copy()
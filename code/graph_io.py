@@ -0,0 +1,275 @@
+import os
+import sys
+import gzip
+import json
+from array import array
+from xml.sax.saxutils import escape, quoteattr
+from compact_graph import CompactGraph, RELATIONS
+
+MAGIC = b"CGRAPH2\n"
+PARQUET_BATCH_ROWS = 65536
+
+
+def _attr_columns(graph, values):
+    # A presence mask plus int64 values (0 where absent), so nodes without
+    # a value come back without one rather than with 0
+    values = values or {}
+    present = array("b", (name in values for name in graph.names))
+    column = array("q", (int(values.get(name, 0)) for name in graph.names))
+    return present, column
+
+
+# Compressed binary edge list: a JSON header line, then the CSR arrays, a
+# presence mask and an int64 column per attribute, then the "\0"-separated
+# node names up to EOF. Loading is a handful of frombytes() calls plus one
+# split.
+
+def write_binary(graph, path, attrs=None):
+    attrs = attrs or {}
+    offsets, targets, relations = graph.csr()
+    header = {"nodes": len(graph), "edges": len(targets),
+              "attrs": list(attrs), "relations": list(RELATIONS),
+              "byteorder": sys.byteorder}
+    with gzip.open(path, "wb", compresslevel=6) as f:
+        f.write(MAGIC)
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        offsets.tofile(f)
+        targets.tofile(f)
+        relations.tofile(f)
+        for name in attrs:
+            for column in _attr_columns(graph, attrs[name]):
+                column.tofile(f)
+        for name in graph.names:
+            f.write(name.encode("utf-8") + b"\0")
+
+
+def read_binary(path):
+    with gzip.open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a compact graph file")
+    end = data.index(b"\n", len(MAGIC))
+    header = json.loads(data[len(MAGIC):end])
+    view = memoryview(data)
+    pos = end + 1
+    swap = header["byteorder"] != sys.byteorder
+
+    def take(typecode, count):
+        nonlocal pos
+        arr = array(typecode)
+        size = arr.itemsize * count
+        arr.frombytes(view[pos:pos + size])
+        pos += size
+        if swap:
+            arr.byteswap()
+        return arr
+
+    n, m = header["nodes"], header["edges"]
+    offsets = take("i", n + 1)
+    targets = take("i", m)
+    relations = take("b", m)
+    columns = {name: (take("b", n), take("q", n)) for name in header["attrs"]}
+    names = bytes(view[pos:]).decode("utf-8").split("\0")[:n]
+    graph = CompactGraph.from_csr(names, offsets, targets, relations)
+    attrs = {name: {node: value for node, flag, value in zip(names, present, column) if flag}
+             for name, (present, column) in columns.items()}
+    return graph, attrs
+
+
+def write_graphml(graph, path, attrs=None):
+    # Written node by node and edge by edge; never holds the document
+    attrs = attrs or {}
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        for name in attrs:
+            f.write(f'  <key id={quoteattr(name)} for="node" '
+                    f'attr.name={quoteattr(name)} attr.type="long"/>\n')
+        f.write('  <key id="relation" for="edge" attr.name="relation" attr.type="string"/>\n'
+                '  <graph edgedefault="directed">\n')
+        for name in graph.names:
+            data = "".join(f'<data key={quoteattr(key)}>{values[name]}</data>'
+                           for key, values in attrs.items() if name in values)
+            f.write(f'    <node id={quoteattr(name)}>{data}</node>\n')
+        for src, dst, relation in graph.edges():
+            f.write(f'    <edge source={quoteattr(src)} target={quoteattr(dst)}>'
+                    f'<data key="relation">{escape(relation)}</data></edge>\n')
+        f.write("  </graph>\n</graphml>\n")
+
+
+def read_graphml(path):
+    import xml.etree.ElementTree as ET
+
+    ns = "{http://graphml.graphdrawing.org/xmlns}"
+    graph, attrs = CompactGraph(), {}
+    for _, elem in ET.iterparse(path):
+        if elem.tag == ns + "key" and elem.get("for") == "node":
+            attrs.setdefault(elem.get("id"), {})
+        elif elem.tag == ns + "node":
+            name = elem.get("id")
+            graph.add_node(name)
+            for data in elem:
+                values = attrs.setdefault(data.get("key"), {})
+                text = (data.text or "").strip()
+                if text:
+                    values[name] = int(text)
+            elem.clear()
+        elif elem.tag == ns + "edge":
+            relation = "uses"
+            for data in elem:
+                if data.get("key") == "relation":
+                    relation = data.text
+            graph.add_edge(elem.get("source"), elem.get("target"), relation)
+            elem.clear()
+    return graph.freeze(), attrs
+
+
+def write_jsonl(graph, path, attrs=None):
+    # One JSON object per line: nodes first, then edges
+    attrs = attrs or {}
+    with open(path, "w", encoding="utf-8") as f:
+        for name in graph.names:
+            record = {"node": name}
+            for key, values in attrs.items():
+                if name in values:
+                    record[key] = values[name]
+            f.write(json.dumps(record) + "\n")
+        for src, dst, relation in graph.edges():
+            f.write(json.dumps({"source": src, "target": dst,
+                                "relation": relation}) + "\n")
+
+
+def read_jsonl(path):
+    graph, attrs = CompactGraph(), {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if "node" in record:
+                name = record.pop("node")
+                graph.add_node(name)
+                for key, value in record.items():
+                    attrs.setdefault(key, {})[name] = value
+            else:
+                graph.add_edge(record["source"], record["target"],
+                               record.get("relation", "uses"))
+    return graph.freeze(), attrs
+
+
+def write_parquet(graph, directory, attrs=None, batch_rows=PARQUET_BATCH_ROWS):
+    # nodes.parquet (id, name, attrs...) and edges.parquet (source, target,
+    # relation) with integer ids, so the CSR arrays load back directly.
+    # Both are streamed one row group of `batch_rows` at a time.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    attrs = attrs or {}
+    os.makedirs(directory, exist_ok=True)
+    names = graph.names
+    offsets, targets, relations = graph.csr()
+
+    node_schema = pa.schema([("id", pa.int32()), ("name", pa.string())]
+                            + [(name, pa.int64()) for name in attrs])
+    with pq.ParquetWriter(os.path.join(directory, "nodes.parquet"), node_schema) as writer:
+        for start in range(0, len(names), batch_rows):
+            chunk = names[start:start + batch_rows]
+            columns = [pa.array(range(start, start + len(chunk)), pa.int32()),
+                       pa.array(chunk, pa.string())]
+            for values in attrs.values():
+                # Nulls where a node has no value
+                columns.append(pa.array([values.get(node) for node in chunk], pa.int64()))
+            writer.write_batch(pa.record_batch(columns, schema=node_schema))
+
+    edge_schema = pa.schema([("source", pa.int32()), ("target", pa.int32()),
+                             ("relation", pa.int8())])
+    with pq.ParquetWriter(os.path.join(directory, "edges.parquet"), edge_schema) as writer:
+        row, total = 0, len(targets)
+        for start in range(0, total, batch_rows):
+            end = min(start + batch_rows, total)
+            sources = array("i")
+            while row < len(names) and offsets[row] < end:
+                lo, hi = max(offsets[row], start), min(offsets[row + 1], end)
+                sources.extend(array("i", [row]) * (hi - lo))
+                if offsets[row + 1] > end:
+                    break
+                row += 1
+            writer.write_batch(pa.record_batch([
+                pa.array(sources, pa.int32()),
+                pa.array(targets[start:end], pa.int32()),
+                pa.array(relations[start:end], pa.int8()),
+            ], schema=edge_schema))
+
+
+def read_parquet(directory):
+    import pyarrow.parquet as pq
+
+    nodes = pq.read_table(os.path.join(directory, "nodes.parquet"))
+    edges = pq.read_table(os.path.join(directory, "edges.parquet"))
+    names = nodes.column("name").to_pylist()
+    # Rows were written in CSR order, so offsets follow from the sources
+    offsets = array("i", bytes(4 * (len(names) + 1)))
+    for s in edges.column("source").to_pylist():
+        offsets[s + 1] += 1
+    for i in range(len(names)):
+        offsets[i + 1] += offsets[i]
+    targets = array("i", edges.column("target").to_pylist())
+    relations = array("b", edges.column("relation").to_pylist())
+    graph = CompactGraph.from_csr(names, offsets, targets, relations)
+    attrs = {col: {node: value for node, value in zip(names, nodes.column(col).to_pylist())
+                   if value is not None}
+             for col in nodes.column_names if col not in ("id", "name")}
+    return graph, attrs
+
+
+FORMATS = {
+    ".cgz": (write_binary, read_binary),
+    ".graphml": (write_graphml, read_graphml),
+    ".jsonl": (write_jsonl, read_jsonl),
+    ".parquet": (write_parquet, read_parquet),  # a directory of two tables
+}
+
+
+def export_graph(graph, path, attrs=None):
+    FORMATS[os.path.splitext(path)[1].lower()][0](graph, path, attrs)
+
+
+def import_graph(path):
+    return FORMATS[os.path.splitext(path)[1].lower()][1](path)
+
+
+def build_graphs(folder_path):
+    # The module, package and class graphs with their LOC and churn
+    from module_view import get_module_locs, get_module_churn, get_module_dependencies
+    from aggregated_module_view import (get_aggregated_locs, get_aggregated_churn,
+                                        get_package_dependencies)
+    from advanced import (extract_relations_from_folder, get_class_locs, short_name_locs,
+                          get_churn_by_file, map_churn_to_classes)
+
+    module_locs = get_module_locs(folder_path)
+    module_graph = CompactGraph.from_edges(get_module_dependencies(folder_path),
+                                           nodes=module_locs)
+    package_locs = get_aggregated_locs(folder_path)
+    package_graph = CompactGraph.from_edges(get_package_dependencies(folder_path),
+                                            nodes=package_locs)
+    inheritance, usage = extract_relations_from_folder(folder_path)
+    class_graph = CompactGraph.from_class_relations(inheritance, usage)
+    class_churn = map_churn_to_classes(folder_path, get_churn_by_file(folder_path))
+    return {
+        "module": (module_graph, {"loc": module_locs,
+                                  "churn": get_module_churn(folder_path)}),
+        "package": (package_graph, {"loc": package_locs,
+                                    "churn": get_aggregated_churn(folder_path)}),
+        "class": (class_graph, {"loc": short_name_locs(get_class_locs(folder_path)),
+                                "churn": class_churn}),
+    }
+
+
+if __name__ == "__main__":
+    # python graph_io.py api graphs .cgz
+    folder = sys.argv[1] if len(sys.argv) > 1 else "api"
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else "graphs"
+    ext = sys.argv[3] if len(sys.argv) > 3 else ".cgz"
+    os.makedirs(output_dir, exist_ok=True)
+    for kind, (graph, attrs) in build_graphs(folder).items():
+        path = os.path.join(output_dir, f"{kind}_graph{ext}")
+        export_graph(graph, path, attrs)
+        print(f"Wrote {kind} graph ({len(graph)} nodes, {graph.number_of_edges()} edges) to {path}")
@@ -1,27 +1,24 @@
 
 import os
-import ast
 import subprocess
 import networkx as nx
 import plotly.graph_objects as go
+from graph_filter import filter_graph
+from discovery import discover, read_source, read_sources
+from scope import load_scope
+from fast_scan import from_imports
 
 
 def get_module_locs(folder_path):
     locs = {}
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py"):
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(
-                    full_path, folder_path).replace("\\", "/")
-                try:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        lines = f.readlines()
-                        loc = sum(1 for line in lines if line.strip()
-                                  and not line.strip().startswith("#"))
-                        locs[rel_path] = loc
-                except Exception as e:
-                    print(f"Error reading {rel_path}: {e}")
+    for entry, source in read_sources(discover(folder_path)):
+        try:
+            lines = source.splitlines()
+            loc = sum(1 for line in lines if line.strip()
+                      and not line.strip().startswith(b"#"))
+            locs[entry.rel_path] = loc
+        except Exception as e:
+            print(f"Error reading {entry.rel_path}: {e}")
     return locs
 
 
@@ -33,51 +30,35 @@ def get_module_churn(folder_path):
         stderr=subprocess.PIPE,
         text=True
     )
+    # Same scope as discover(), so excluded files never turn up as
+    # churn-only nodes
+    scope = load_scope(folder_path)
     file_changes = result.stdout.splitlines()
     for file in file_changes:
-        if file.strip().endswith(".py"):
-            churn[file.strip()] = churn.get(file.strip(), 0) + 1
+        file = file.strip()
+        if file.endswith(".py") and scope.includes(file):
+            churn[file] = churn.get(file, 0) + 1
     return churn
 
 
 def get_module_dependencies(folder_path):
     dependencies = []
-    modules = set()
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py"):
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(
-                    full_path, folder_path).replace("\\", "/")
-                modules.add(rel_path)
-                try:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        tree = ast.parse(f.read(), filename=rel_path)
-                        for node in ast.walk(tree):
-                            if isinstance(node, ast.ImportFrom):
-                                if node.module and not node.level:
-                                    target = node.module.replace(
-                                        ".", "/") + ".py"
-                                    if target in modules:
-                                        dependencies.append((rel_path, target))
-                except Exception as e:
-                    print(f"Failed to parse {rel_path}: {e}")
+    # Known up front, so imports of modules listed later still resolve
+    modules = {entry.rel_path for entry in discover(folder_path)}
+    for entry in discover(folder_path):
+        try:
+            for module in from_imports(read_source(entry)):
+                target = module.replace(".", "/") + ".py"
+                if target in modules:
+                    dependencies.append((entry.rel_path, target))
+        except Exception as e:
+            print(f"Failed to parse {entry.rel_path}: {e}")
     return dependencies
 
 
-def visualize_module_graph(folder_path, output_file="module_view.html"):
-    locs = get_module_locs(folder_path)
-    churn = get_module_churn(folder_path)
-    edges = get_module_dependencies(folder_path)
-
-    G = nx.DiGraph()
-    for module in set(locs) | set(churn):
-        G.add_node(module)
-
-    for src, tgt in edges:
-        G.add_edge(src, tgt)
-
-    pos = nx.spring_layout(G, seed=42)
+def build_module_figure(G, locs, churn, title="Module Dependency View (LOC + Churn)", pos=None):
+    if pos is None:
+        pos = nx.spring_layout(G, seed=42)
 
     node_x, node_y, node_size, node_color, node_text = [], [], [], [], []
     for node in G.nodes():
@@ -112,8 +93,7 @@ def visualize_module_graph(folder_path, output_file="module_view.html"):
             )
         ],
         layout=go.Layout(
-            title=dict(text="Module Dependency View (LOC + Churn)",
-                       font=dict(size=20)),
+            title=dict(text=title, font=dict(size=20)),
             showlegend=False,
             hovermode='closest',
             margin=dict(b=20, l=5, r=5, t=40),
@@ -121,9 +101,29 @@ def visualize_module_graph(folder_path, output_file="module_view.html"):
             yaxis=dict(showgrid=False, zeroline=False)
         )
     )
+    return fig
+
+
+def visualize_module_graph(folder_path, output_file="module_view.html", view=None):
+    locs = get_module_locs(folder_path)
+    churn = get_module_churn(folder_path)
+    edges = get_module_dependencies(folder_path)
+
+    G = nx.DiGraph()
+    for module in set(locs) | set(churn):
+        G.add_node(module)
+
+    for src, tgt in edges:
+        G.add_edge(src, tgt)
+
+    # Narrow the graph before layout, e.g. view=dict(focus=..., radius=2)
+    if view:
+        G = filter_graph(G, metrics={"loc": locs, "churn": churn}, **view)
+
+    fig = build_module_figure(G, locs, churn)
     fig.write_html(output_file)
     print(f"Saved interactive module view to: {output_file}")
 
 
-# Example usage:
-visualize_module_graph("api", "module_view.html")
+if __name__ == "__main__":
+    visualize_module_graph("api", "module_view.html")
@@ -0,0 +1,245 @@
+import os
+import sys
+from collections import deque
+from compact_graph import CompactGraph
+from discovery import FileEntry, read_source
+from fast_scan import from_imports
+from scope import load_scope
+
+
+def _bits(mask):
+    # Indices of the set bits in an int bitset
+    s = bin(mask)[:1:-1]
+    i = s.find("1")
+    while i != -1:
+        yield i
+        i = s.find("1", i + 1)
+
+
+class ReachabilityIndex:
+    """Transitive closure over the SCC condensation, stored as int bitsets.
+
+    comp[node] is the strongly connected component of a node; desc[c] and
+    anc[c] are bitsets of the components reachable from / reaching c. After
+    build() the index owns its adjacency, so update_module() can patch it
+    without touching the source graph.
+    """
+
+    def __init__(self, graph, relation=None):
+        self.names = list(graph.names)
+        self.ids = dict(graph.ids)
+        self.succ = [set() for _ in self.names]
+        for node_id in range(len(self.names)):
+            self.succ[node_id].update(graph.successor_ids(node_id, relation))
+        self.build()
+
+    def build(self):
+        self.comp, self.members = self._strongly_connected_components()
+        # Components come out of Tarjan sinks first, so one forward pass
+        # fills desc and one backward pass fills anc.
+        self.csucc = [set() for _ in self.members]
+        for c, members in enumerate(self.members):
+            for u in members:
+                for v in self.succ[u]:
+                    if self.comp[v] != c:
+                        self.csucc[c].add(self.comp[v])
+        cpred = [set() for _ in self.members]
+        for c, succs in enumerate(self.csucc):
+            for d in succs:
+                cpred[d].add(c)
+
+        self.desc = [0] * len(self.members)
+        for c, succs in enumerate(self.csucc):
+            mask = 0
+            for d in succs:
+                mask |= (1 << d) | self.desc[d]
+            self.desc[c] = mask
+        self.anc = [0] * len(self.members)
+        for c in range(len(self.members) - 1, -1, -1):
+            mask = 0
+            for p in cpred[c]:
+                mask |= (1 << p) | self.anc[p]
+            self.anc[c] = mask
+
+    def _strongly_connected_components(self):
+        # Iterative Tarjan; recursion would overflow on deep import chains
+        n = len(self.names)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = bytearray(n)
+        stack = []
+        comp = [-1] * n
+        members = []
+        counter = 0
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            work = [(root, iter(self.succ[root]))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            while work:
+                node, it = work[-1]
+                for nxt in it:
+                    if index[nxt] == -1:
+                        index[nxt] = low[nxt] = counter
+                        counter += 1
+                        stack.append(nxt)
+                        on_stack[nxt] = 1
+                        work.append((nxt, iter(self.succ[nxt])))
+                        break
+                    if on_stack[nxt]:
+                        low[node] = min(low[node], index[nxt])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        group = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = 0
+                            comp[member] = len(members)
+                            group.append(member)
+                            if member == node:
+                                break
+                        members.append(group)
+        return comp, members
+
+    def _expand(self, mask, node_id):
+        # Names of all nodes in the components of `mask`, plus the other
+        # members of node_id's own component when it sits on a cycle
+        names = self.names
+        result = [names[m] for m in self.members[self.comp[node_id]]
+                  if m != node_id]
+        for c in _bits(mask):
+            result.extend(names[m] for m in self.members[c])
+        return result
+
+    def dependencies(self, name):
+        # Everything `name` depends on, directly or transitively
+        node_id = self.ids[name]
+        return self._expand(self.desc[self.comp[node_id]], node_id)
+
+    def impact(self, name):
+        # Everything that (transitively) depends on `name`
+        node_id = self.ids[name]
+        return self._expand(self.anc[self.comp[node_id]], node_id)
+
+    def depends_on(self, src, dst):
+        a, b = self.comp[self.ids[src]], self.comp[self.ids[dst]]
+        return a == b or bool(self.desc[a] >> b & 1)
+
+    def _add_node(self, name):
+        node_id = len(self.names)
+        self.names.append(name)
+        self.ids[name] = node_id
+        self.succ.append(set())
+        self.comp.append(len(self.members))
+        self.members.append([node_id])
+        self.csucc.append(set())
+        self.desc.append(0)
+        self.anc.append(0)
+        return node_id
+
+    def update_module(self, name, targets):
+        # Replace the outgoing edges of one node (e.g. after a file changed).
+        # When the node is not on a cycle and the edit creates none, only the
+        # closures of its ancestors and of the nodes it gains or loses are
+        # recomputed; anything else falls back to a full rebuild.
+        node_id = self.ids[name] if name in self.ids else self._add_node(name)
+        new_succ = {self.ids[t] if t in self.ids else self._add_node(t)
+                    for t in targets}
+        new_succ.discard(node_id)
+        if new_succ == self.succ[node_id]:
+            return
+        self.succ[node_id] = new_succ
+
+        cu = self.comp[node_id]
+        cycle = len(self.members[cu]) > 1 or any(
+            self.anc[cu] >> self.comp[v] & 1 for v in new_succ)
+        if cycle:
+            self.build()
+            return
+
+        old_desc = self.desc[cu]
+        self.csucc[cu] = {self.comp[v] for v in new_succ}
+        affected = [cu] + list(_bits(self.anc[cu]))
+        affected_set = set(affected)
+
+        # Kahn over the affected components, sinks first
+        pending = {c: len(self.csucc[c] & affected_set) for c in affected}
+        parents = {c: [] for c in affected}
+        for c in affected:
+            for d in self.csucc[c] & affected_set:
+                parents[d].append(c)
+        queue = deque(c for c in affected if not pending[c])
+        changed = 0
+        while queue:
+            c = queue.popleft()
+            mask = 0
+            for d in self.csucc[c]:
+                mask |= (1 << d) | self.desc[d]
+            self.desc[c] = mask
+            changed |= mask
+            for p in parents[c]:
+                pending[p] -= 1
+                if not pending[p]:
+                    queue.append(p)
+
+        for d in _bits(changed | old_desc):
+            mask = self.anc[d]
+            for a in affected:
+                if self.desc[a] >> d & 1:
+                    mask |= 1 << a
+                else:
+                    mask &= ~(1 << a)
+            self.anc[d] = mask
+
+
+def build_module_index(folder_path):
+    from module_view import get_module_dependencies, get_module_locs
+
+    graph = CompactGraph.from_edges(get_module_dependencies(folder_path),
+                                    nodes=get_module_locs(folder_path))
+    return ReachabilityIndex(graph)
+
+
+def module_imports(folder_path, rel_path):
+    # Current in-folder imports of one file, resolved like
+    # get_module_dependencies; a deleted file imports nothing. Targets are
+    # checked on disk and against the scope rather than against the index,
+    # so the order in which changed files are refreshed does not matter.
+    full_path = os.path.join(folder_path, rel_path)
+    try:
+        st = os.stat(full_path)
+    except FileNotFoundError:
+        return []
+    # A fresh stat, so the read cache never serves the old contents
+    source = read_source(FileEntry(rel_path, full_path, st.st_size, st.st_mtime))
+    scope = load_scope(folder_path)
+    targets = (module.replace(".", "/") + ".py" for module in from_imports(source))
+    return [target for target in targets if scope.includes(target)
+            and os.path.isfile(os.path.join(folder_path, target))]
+
+
+def refresh_module(index, folder_path, rel_path):
+    # Re-scan one changed file and patch the index in place
+    targets = module_imports(folder_path, rel_path)
+    index.update_module(rel_path, targets)
+    return targets
+
+
+if __name__ == "__main__":
+    # python reachability.py api zeeguu/core/model/user.py
+    folder = sys.argv[1] if len(sys.argv) > 1 else "api"
+    index = build_module_index(folder)
+    for module in sys.argv[2:]:
+        print(f"{module} depends on:")
+        for dep in sorted(index.dependencies(module)):
+            print(f"  {dep}")
+        print(f"Changing {module} affects:")
+        for dep in sorted(index.impact(module)):
+            print(f"  {dep}")
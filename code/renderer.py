@@ -0,0 +1,94 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import networkx as nx
+
+
+def compute_layout(G, seed=42):
+    return nx.spring_layout(G, seed=seed)
+
+
+def write_html(G, pos, output_file, figure=None, **kwargs):
+    # `figure` builds the Plotly figure from a precomputed layout; it has to
+    # be a module-level function so it can be sent to a worker process
+    if figure is None:
+        from module_view import build_module_figure as figure
+        kwargs.setdefault("locs", {})
+        kwargs.setdefault("churn", {})
+    figure(G, pos=pos, **kwargs).write_html(output_file)
+    return output_file
+
+
+def write_image(G, pos, output_file, title="", edge_labels=True, edge_attr="relation",
+                dpi=300, figsize=(14, 10), node_size=2000, node_color="lightyellow",
+                font_size=10):
+    # Headless Agg canvas; the format follows the file extension
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot()
+    nx.draw(G, pos, ax=ax, with_labels=True, node_size=node_size,
+            node_color=node_color, font_size=font_size, arrows=True)
+    if edge_labels:
+        nx.draw_networkx_edge_labels(G, pos, ax=ax, font_color="red",
+                                     edge_labels=nx.get_edge_attributes(G, edge_attr))
+    ax.set_title(title)
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=dpi)
+    return output_file
+
+
+def write_dot(G, pos, output_file, title="", edge_attr="relation", scale=None):
+    # Node positions are pinned ("x,y!") so `neato -n` reuses our layout.
+    # Positions are in points; spring_layout's [-1, 1] box is stretched to
+    # about two inches per node along each axis.
+    if scale is None:
+        scale = 72 * max(1.0, G.number_of_nodes() ** 0.5)
+    with open(output_file, "w") as f:
+        f.write("digraph G {\n")
+        if title:
+            f.write(f'  label="{title}";\n')
+        f.write("  node [shape=box, style=filled, fillcolor=lightblue];\n")
+        for node in G.nodes():
+            x, y = pos[node]
+            f.write(f'  "{node}" [pos="{x * scale:.3f},{y * scale:.3f}!"];\n')
+        for u, v, label in G.edges(data=edge_attr):
+            attrs = f' [label="{label}"]' if label else ""
+            f.write(f'  "{u}" -> "{v}"{attrs};\n')
+        f.write("}\n")
+    return output_file
+
+
+WRITERS = {
+    ".html": write_html,
+    ".png": write_image,
+    ".svg": write_image,
+    ".pdf": write_image,
+    ".dot": write_dot,
+}
+
+
+def render_all(G, outputs, pos=None, workers=None):
+    # outputs: {output_file: writer kwargs}. The layout is computed once and
+    # every output is written concurrently, one worker per file.
+    if not isinstance(outputs, dict):
+        outputs = {output_file: {} for output_file in outputs}
+    if not outputs:
+        return []
+    if pos is None:
+        pos = compute_layout(G)
+
+    written = []
+    with ProcessPoolExecutor(max_workers=workers or len(outputs)) as pool:
+        futures = {}
+        for output_file, kwargs in outputs.items():
+            writer = WRITERS[os.path.splitext(output_file)[1].lower()]
+            futures[pool.submit(writer, G, pos, output_file, **kwargs)] = output_file
+        for future in as_completed(futures):
+            try:
+                written.append(future.result())
+                print(f"Saved {futures[future]}")
+            except Exception as e:
+                print(f"[!] Rendering {futures[future]} failed: {e}")
+    return written
@@ -0,0 +1,120 @@
+import os
+import re
+import json
+from functools import lru_cache
+
+SCOPE_CONFIG = "scope.json"
+
+# Never worth parsing: VCS metadata, virtualenvs, build output, vendored
+# code and tests
+DEFAULT_EXCLUDES = [
+    ".git/", ".hg/", ".venv/", "venv/", ".tox/", ".nox/",
+    "__pycache__/", "build/", "dist/", "*.egg-info/", "node_modules/",
+    "site-packages/", "vendor/", "third_party/",
+    "tests/", "test/", "test_*.py", "*_test.py", "conftest.py",
+]
+
+
+def _glob_to_regex(pattern):
+    # gitignore flavour: "*" stays within one path segment, "**" crosses
+    # segments, a leading or inner "/" anchors the pattern to the root,
+    # a trailing "/" only matches directories (and what is below them).
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    out, i = [], 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1:]:
+            end = pattern.index("]", i + 1)
+            out.append("[" + pattern[i + 1:end].replace("!", "^", 1) + "]")
+            i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+
+    body = "".join(out)
+    prefix = "" if anchored else "(?:.*/)?"
+    # Directories are matched with a trailing "/", see Scope.excludes
+    suffix = "/.*" if dir_only else "(?:/.*)?"
+    return prefix + body + suffix
+
+
+def compile_patterns(patterns):
+    if not patterns:
+        return None
+    return re.compile("(?:" + "|".join(_glob_to_regex(p) for p in patterns) + ")$")
+
+
+def read_gitignore(folder_path):
+    patterns = []
+    for path in (os.path.join(folder_path, ".gitignore"),
+                 os.path.join(folder_path, ".git", "info", "exclude")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.rstrip("\n").rstrip()
+                    if line and not line.startswith("#"):
+                        patterns.append(line)
+        except OSError:
+            continue
+    return patterns
+
+
+class Scope:
+    """Include/exclude rules compiled into single regexes.
+
+    Negated ("!pattern") entries re-include paths matched by any exclude;
+    unlike git, ordering between excludes and negations is not tracked.
+    """
+
+    def __init__(self, include=None, exclude=()):
+        exclude = list(exclude)
+        self.exclude = compile_patterns([p for p in exclude if not p.startswith("!")])
+        self.negate = compile_patterns([p[1:] for p in exclude if p.startswith("!")])
+        self.include = compile_patterns(include)
+
+    @classmethod
+    def from_folder(cls, folder_path, config_path=None, defaults=True,
+                    gitignore=True, exclude=(), include=None):
+        config = {}
+        config_path = config_path or os.path.join(folder_path, SCOPE_CONFIG)
+        if os.path.exists(config_path):
+            with open(config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        patterns = list(DEFAULT_EXCLUDES) if config.get("defaults", defaults) else []
+        if config.get("gitignore", gitignore):
+            patterns += read_gitignore(folder_path)
+        patterns += config.get("exclude", []) + list(exclude)
+        include = (include or []) + config.get("include", []) or None
+        return cls(include=include, exclude=patterns)
+
+    def excludes(self, rel_path, is_dir=False):
+        path = rel_path + "/" if is_dir else rel_path
+        if self.exclude is None or not self.exclude.match(path):
+            return False
+        return self.negate is None or not self.negate.match(path)
+
+    def includes(self, rel_path):
+        if self.excludes(rel_path):
+            return False
+        return self.include is None or bool(self.include.match(rel_path))
+
+
+@lru_cache(maxsize=None)
+def load_scope(folder_path):
+    return Scope.from_folder(folder_path)
+
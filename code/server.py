@@ -0,0 +1,226 @@
+import sys
+import json
+import asyncio
+from collections import defaultdict
+from urllib.parse import urlsplit, parse_qs
+from compact_graph import CompactGraph
+from graph_filter import filter_graph
+from reachability import ReachabilityIndex
+from module_view import (get_module_locs, get_module_churn,
+                         get_module_dependencies, build_module_figure)
+from aggregated_module_view import (get_package_name, should_exclude, get_aggregated_locs,
+                                    get_aggregated_churn, get_package_dependencies)
+from advanced import (extract_relations_from_folder, get_class_locs, short_name_locs,
+                      get_churn_by_file, map_churn_to_classes, build_class_figure)
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+
+class QueryError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ArchitectureIndex:
+    """Module graph, metrics and reachability, loaded once and kept warm."""
+
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        self.locs = get_module_locs(folder_path)
+        self.churn = get_module_churn(folder_path)
+        self.graph = CompactGraph.from_edges(
+            get_module_dependencies(folder_path), nodes=self.locs)
+        self.reach = ReachabilityIndex(self.graph)
+        self.package_stats = self._package_rollup()
+        self.views = {}
+
+    def _node(self, params, key="node"):
+        name = params.get(key)
+        if not name:
+            raise QueryError(400, f"missing parameter: {key}")
+        if name not in self.graph:
+            raise QueryError(404, f"unknown module: {name}")
+        return name
+
+    def _package_rollup(self):
+        stats = defaultdict(lambda: {"modules": 0, "loc": 0, "churn": 0,
+                                     "depends_on": set()})
+        for module in self.graph.names:
+            if should_exclude(module):
+                continue
+            pkg = stats[get_package_name(module)]
+            pkg["modules"] += 1
+            pkg["loc"] += self.locs.get(module, 0)
+            pkg["churn"] += self.churn.get(module, 0)
+        for src, tgt, _ in self.graph.edges():
+            if should_exclude(src) or should_exclude(tgt):
+                continue
+            src_pkg, tgt_pkg = get_package_name(src), get_package_name(tgt)
+            if src_pkg != tgt_pkg:
+                stats[src_pkg]["depends_on"].add(tgt_pkg)
+        return {name: dict(s, depends_on=sorted(s["depends_on"]))
+                for name, s in stats.items()}
+
+    def neighbors(self, params):
+        node = self._node(params)
+        direction = params.get("direction", "out")
+        result = {"node": node}
+        if direction in ("out", "both"):
+            result["imports"] = self.graph.neighbors(node)
+        if direction in ("in", "both"):
+            result["imported_by"] = self.graph.predecessors(node)
+        return result
+
+    def hotspots(self, params):
+        n = int(params.get("n", 10))
+        scored = sorted(((self.locs.get(m, 0) + self.churn.get(m, 0), m)
+                         for m in self.graph.names), reverse=True)[:n]
+        return [{"module": m, "loc": self.locs.get(m, 0),
+                 "churn": self.churn.get(m, 0), "score": score}
+                for score, m in scored]
+
+    def packages(self, params):
+        name = params.get("package")
+        if name is None:
+            return self.package_stats
+        if name not in self.package_stats:
+            raise QueryError(404, f"unknown package: {name}")
+        return {name: self.package_stats[name]}
+
+    def path(self, params):
+        src, dst = self._node(params, "src"), self._node(params, "dst")
+        return {"src": src, "dst": dst,
+                "path": self.graph.shortest_path(src, dst)}
+
+    def dependencies(self, params):
+        node = self._node(params)
+        return {"node": node, "dependencies": sorted(self.reach.dependencies(node))}
+
+    def impact(self, params):
+        node = self._node(params)
+        return {"node": node, "impact": sorted(self.reach.impact(node))}
+
+    def _view(self, level):
+        # (networkx graph, metrics, figure builder) per view level, built on
+        # first use: the package and class views need their own scans
+        if level not in self.views:
+            if level == "module":
+                metrics = {"loc": self.locs, "churn": self.churn}
+                G = self.graph.to_networkx()
+                figure = lambda H: build_module_figure(H, self.locs, self.churn)
+            elif level == "package":
+                metrics = {"loc": get_aggregated_locs(self.folder_path),
+                           "churn": get_aggregated_churn(self.folder_path)}
+                G = CompactGraph.from_edges(get_package_dependencies(self.folder_path),
+                                            nodes=metrics["loc"]).to_networkx()
+                figure = lambda H: build_module_figure(
+                    H, metrics["loc"], metrics["churn"],
+                    title="Aggregated Package Dependency View (LOC + Churn)")
+            elif level == "class":
+                inheritance, usage = extract_relations_from_folder(self.folder_path)
+                metrics = {"loc": short_name_locs(get_class_locs(self.folder_path)),
+                           "churn": map_churn_to_classes(
+                               self.folder_path, get_churn_by_file(self.folder_path))}
+                G = CompactGraph.from_class_relations(inheritance, usage).to_networkx()
+                figure = lambda H: build_class_figure(H, metrics["loc"], metrics["churn"])
+            else:
+                raise QueryError(400, f"unknown level: {level} (module, package or class)")
+            self.views[level] = (G, metrics, figure)
+        return self.views[level]
+
+    def view(self, params):
+        # Slice of the graph to send to the browser: filter_graph options
+        # taken from the query string, or else the top-n hotspots
+        G, metrics, figure = self._view(params.get("level", "module"))
+        focus = params.get("node")
+        if focus is not None and focus not in G:
+            raise QueryError(404, f"unknown node: {focus}")
+        metric = params.get("metric")
+        if metric is not None and metric not in metrics:
+            raise QueryError(400, f"unknown metric: {metric} (loc or churn)")
+        if focus or any(k in params for k in ("include", "exclude", "min_degree", "metric")):
+            G = filter_graph(
+                G, focus=focus,
+                radius=int(params.get("radius", 1)),
+                direction=params.get("direction", "both"),
+                include=params["include"].split(",") if "include" in params else None,
+                exclude=params["exclude"].split(",") if "exclude" in params else None,
+                min_degree=int(params.get("min_degree", 0)),
+                metric=metric,
+                min_metric=float(params.get("min", 0)),
+                metrics=metrics)
+        else:
+            loc, churn = metrics["loc"], metrics["churn"]
+            hot = sorted(G.nodes(), key=lambda n: loc.get(n, 0) + churn.get(n, 0),
+                         reverse=True)[:int(params.get("n", 50))]
+            G = G.subgraph(hot)
+        return figure(G).to_html(include_plotlyjs="cdn")
+
+
+JSON_ROUTES = {
+    "/neighbors": ArchitectureIndex.neighbors,
+    "/hotspots": ArchitectureIndex.hotspots,
+    "/packages": ArchitectureIndex.packages,
+    "/path": ArchitectureIndex.path,
+    "/dependencies": ArchitectureIndex.dependencies,
+    "/impact": ArchitectureIndex.impact,
+}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+async def handle_request(index, reader, writer):
+    try:
+        request_line = await reader.readline()
+        # Drain headers; only GET without a body is supported
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request_line.decode("latin-1").split()
+        status, content_type = 200, "application/json"
+        try:
+            if len(parts) < 2 or parts[0] != "GET":
+                raise QueryError(405, "only GET is supported")
+            url = urlsplit(parts[1])
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if url.path == "/view":
+                # Layout is CPU bound; keep the loop free for other queries
+                loop = asyncio.get_running_loop()
+                body = await loop.run_in_executor(None, index.view, params)
+                content_type = "text/html"
+            elif url.path in JSON_ROUTES:
+                body = json.dumps(JSON_ROUTES[url.path](index, params))
+            else:
+                raise QueryError(404, f"unknown endpoint: {url.path}")
+        except QueryError as e:
+            status, body = e.status, json.dumps({"error": str(e)})
+        except ValueError as e:
+            status, body = 400, json.dumps({"error": str(e)})
+        except Exception as e:
+            status, body = 500, json.dumps({"error": f"{type(e).__name__}: {e}"})
+
+        payload = body.encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + payload)
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(folder_path, host=HOST, port=PORT):
+    index = ArchitectureIndex(folder_path)
+    server = await asyncio.start_server(
+        lambda r, w: handle_request(index, r, w), host, port)
+    print(f"Serving architecture data for {folder_path} on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else "api"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else PORT
+    asyncio.run(serve(folder, port=port))
@@ -1,8 +1,9 @@
 
-import os
 import ast
 import subprocess
 from collections import defaultdict
+from discovery import discover, read_source, read_sources
+from fast_scan import scan
 
 TOP_N = 15
 
@@ -10,23 +11,18 @@ TOP_N = 15
 def compute_class_locs_and_files(folder_path):
     class_locs = {}
     class_files = {}
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py"):
-                rel_path = os.path.relpath(os.path.join(
-                    root, file), folder_path).replace("\\", "/")
-                try:
-                    with open(os.path.join(root, file), "r", encoding="utf-8") as f:
-                        lines = f.readlines()
-                        loc = sum(1 for line in lines if line.strip()
-                                  and not line.strip().startswith("#"))
-                        tree = ast.parse("".join(lines))
-                        for node in ast.walk(tree):
-                            if isinstance(node, ast.ClassDef):
-                                class_locs[node.name] = loc
-                                class_files[node.name] = rel_path
-                except:
-                    continue
+    for entry, source in read_sources(discover(folder_path)):
+        try:
+            lines = source.splitlines()
+            loc = sum(1 for line in lines if line.strip()
+                      and not line.strip().startswith(b"#"))
+            tree = ast.parse(source)
+            for node in ast.walk(tree):
+                if isinstance(node, ast.ClassDef):
+                    class_locs[node.name] = loc
+                    class_files[node.name] = entry.rel_path
+        except:
+            continue
     return class_locs, class_files
 
 
@@ -47,21 +43,14 @@ def compute_churn(folder_path):
 
 def extract_import_dependencies(folder_path):
     imports = defaultdict(set)
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py"):
-                src = os.path.relpath(os.path.join(
-                    root, file), folder_path).replace("\\", "/")
-                try:
-                    with open(os.path.join(root, file), "r", encoding="utf-8") as f:
-                        tree = ast.parse(f.read())
-                        for node in ast.walk(tree):
-                            if isinstance(node, ast.ImportFrom) and node.module:
-                                module_path = node.module.replace(
-                                    ".", "/") + ".py"
-                                imports[src].add(module_path)
-                except:
-                    continue
+    for entry in discover(folder_path):
+        try:
+            for imp in scan(read_source(entry)).imports:
+                if imp.kind == "from" and imp.module:
+                    module_path = imp.module.replace(".", "/") + ".py"
+                    imports[entry.rel_path].add(module_path)
+        except:
+            continue
     return imports
 
 
@@ -1,7 +1,7 @@
-import os
 import ast
 import subprocess
 from collections import defaultdict
+from discovery import discover, read_source
 
 
 def count_small_and_stable_classes(folder_path, loc_threshold=60, churn_threshold=10):
@@ -10,27 +10,22 @@ def count_small_and_stable_classes(folder_path, loc_threshold=60, churn_threshol
     class_files = {}
     churn_counts = defaultdict(int)
 
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py"):
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(
-                    full_path, folder_path).replace("\\", "/")
-                try:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        lines = f.readlines()
-                        tree = ast.parse("".join(lines))
-                        for node in ast.walk(tree):
-                            if isinstance(node, ast.ClassDef):
-                                start = node.lineno - 1
-                                end = max((child.lineno for child in ast.walk(
-                                    node) if hasattr(child, 'lineno')), default=start)
-                                loc = sum(1 for line in lines[start:end] if line.strip(
-                                ) and not line.strip().startswith("#"))
-                                class_locs[node.name] = loc
-                                class_files[node.name] = rel_path
-                except:
-                    continue
+    for entry in discover(folder_path):
+        try:
+            source = read_source(entry)
+            lines = source.splitlines()
+            tree = ast.parse(source)
+            for node in ast.walk(tree):
+                if isinstance(node, ast.ClassDef):
+                    start = node.lineno - 1
+                    end = max((child.lineno for child in ast.walk(
+                        node) if hasattr(child, 'lineno')), default=start)
+                    loc = sum(1 for line in lines[start:end] if line.strip(
+                    ) and not line.strip().startswith(b"#"))
+                    class_locs[node.name] = loc
+                    class_files[node.name] = entry.rel_path
+        except:
+            continue
 
     result = subprocess.run(
         ["git", "-C", folder_path, "log", "--pretty=format:", "--name-only"],
@@ -60,27 +55,22 @@ def count_large_and_active_classes(folder_path, loc_threshold=100, churn_thresho
     class_files = {}
     churn_counts = defaultdict(int)
 
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith(".py"):
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(
-                    full_path, folder_path).replace("\\", "/")
-                try:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        lines = f.readlines()
-                        tree = ast.parse("".join(lines))
-                        for node in ast.walk(tree):
-                            if isinstance(node, ast.ClassDef):
-                                start = node.lineno - 1
-                                end = max((child.lineno for child in ast.walk(
-                                    node) if hasattr(child, 'lineno')), default=start)
-                                loc = sum(1 for line in lines[start:end] if line.strip(
-                                ) and not line.strip().startswith("#"))
-                                class_locs[node.name] = loc
-                                class_files[node.name] = rel_path
-                except:
-                    continue
+    for entry in discover(folder_path):
+        try:
+            source = read_source(entry)
+            lines = source.splitlines()
+            tree = ast.parse(source)
+            for node in ast.walk(tree):
+                if isinstance(node, ast.ClassDef):
+                    start = node.lineno - 1
+                    end = max((child.lineno for child in ast.walk(
+                        node) if hasattr(child, 'lineno')), default=start)
+                    loc = sum(1 for line in lines[start:end] if line.strip(
+                    ) and not line.strip().startswith(b"#"))
+                    class_locs[node.name] = loc
+                    class_files[node.name] = entry.rel_path
+        except:
+            continue
 
     result = subprocess.run(
         ["git", "-C", folder_path, "log", "--pretty=format:", "--name-only"],